@@ -2,18 +2,11 @@ import smartpy as sp
 
 Addresses = sp.io.import_script_from_url("file:helpers/addresses.py")
 Errors = sp.io.import_script_from_url("file:types/errors.py")
+Fund = sp.io.import_script_from_url("file:types/fund.py")
 DummyStore = sp.io.import_script_from_url("file:helpers/dummy_store.py")
 FA12 = sp.io.import_script_from_url("file:helpers/fa12.py")
 FA2 = sp.io.import_script_from_url("file:helpers/fa2.py")
 
-########
-# Types
-########
-
-FA2_TRANSFER_TXS_TYPE = sp.TList(
-    sp.TRecord(to_=sp.TAddress, token_id=sp.TNat, amount=sp.TNat).layout(("to_", ("token_id", "amount")))
-)
-
 ###########
 # Contract
 ###########
@@ -22,14 +15,25 @@ FA2_TRANSFER_TXS_TYPE = sp.TList(
 class CommunityFund(sp.Contract):
     def __init__(self, admin=Addresses.ADMIN):
         # The admin would typically be the DAO contract, in the case of Kickflow.
-        self.init(admin=admin)
+        self.init(
+            admin=admin,
+            allowances=sp.big_map(l={}, tkey=sp.TPair(sp.TAddress, Fund.ASSET_TYPE), tvalue=Fund.ALLOWANCE_TYPE),
+            distributions=sp.big_map(l={}, tkey=sp.TNat, tvalue=Fund.DISTRIBUTION_TYPE),
+            num_distributions=sp.nat(0),
+            claimed=sp.big_map(l={}, tkey=sp.TPair(sp.TNat, sp.TNat), tvalue=sp.TNat),
+            streams=sp.big_map(l={}, tkey=sp.TNat, tvalue=Fund.STREAM_TYPE),
+            num_streams=sp.nat(0),
+            schedules=sp.big_map(l={}, tkey=sp.TNat, tvalue=Fund.SCHEDULE_TYPE),
+            num_schedules=sp.nat(0),
+        )
 
     @sp.entry_point
     def transfer_tez(self, params):
         sp.set_type(params, sp.TRecord(value=sp.TMutez, dest=sp.TAddress).layout(("value", "dest")))
 
-        # Verify that sender is the admin
-        sp.verify(sp.sender == self.data.admin, Errors.NOT_ALLOWED)
+        # Verify that sender is the admin, or a spender with enough allowance
+        sp.if sp.sender != self.data.admin:
+            self.spend_allowance(sp.variant("tez", sp.unit), sp.utils.mutez_to_nat(params.value))
 
         # Transfer tez to mentioned destination
         sp.send(params.dest, params.value)
@@ -43,17 +47,14 @@ class CommunityFund(sp.Contract):
             ),
         )
 
-        # Verify that sender is the admin
-        sp.verify(sp.sender == self.data.admin, Errors.NOT_ALLOWED)
+        # Verify that sender is the admin, or a spender with enough allowance
+        sp.if sp.sender != self.data.admin:
+            self.spend_allowance(sp.variant("fa12", params.token_address), params.value)
 
         # Transfer tokens
-        c = sp.contract(
-            sp.TRecord(from_=sp.TAddress, to_=sp.TAddress, value=sp.TNat).layout(
-                ("from_ as from", ("to_ as to", "value"))
-            ),
-            params.token_address,
-            "transfer",
-        ).open_some(Errors.INVALID_TOKEN_CONTRACT)
+        c = sp.contract(Fund.FA12_TRANSFER_TYPE, params.token_address, "transfer").open_some(
+            Errors.INVALID_TOKEN_CONTRACT
+        )
         sp.transfer(
             sp.record(from_=sp.self_address, to_=params.dest, value=params.value),
             sp.mutez(0),
@@ -64,24 +65,356 @@ class CommunityFund(sp.Contract):
     def transfer_fa2(self, params):
         sp.set_type(
             params,
-            sp.TRecord(token_address=sp.TAddress, txs=FA2_TRANSFER_TXS_TYPE).layout(("token_address", "txs")),
+            sp.TRecord(token_address=sp.TAddress, txs=Fund.FA2_TRANSFER_TXS_TYPE).layout(("token_address", "txs")),
         )
 
-        # Verify that sender is the admin
-        sp.verify(sp.sender == self.data.admin, Errors.NOT_ALLOWED)
+        # Verify that sender is the admin, or a spender with enough allowance
+        sp.if sp.sender != self.data.admin:
+            sp.for tx in params.txs:
+                self.spend_allowance(
+                    sp.variant("fa2", sp.record(token_address=params.token_address, token_id=tx.token_id)),
+                    tx.amount,
+                )
 
         # Transfer tokens
-        c = sp.contract(
-            sp.TList(sp.TRecord(from_=sp.TAddress, txs=FA2_TRANSFER_TXS_TYPE).layout(("from_", "txs"))),
-            params.token_address,
-            "transfer",
-        ).open_some(Errors.INVALID_TOKEN_CONTRACT)
+        c = sp.contract(Fund.FA2_TRANSFER_TYPE, params.token_address, "transfer").open_some(
+            Errors.INVALID_TOKEN_CONTRACT
+        )
         sp.transfer(
             sp.list([sp.record(from_=sp.self_address, txs=params.txs)]),
             sp.mutez(0),
             c,
         )
 
+    @sp.entry_point
+    def transfer_fa2_many(self, transfers):
+        sp.set_type(transfers, sp.TMap(sp.TAddress, Fund.FA2_TRANSFER_TXS_TYPE))
+
+        is_admin = sp.compute(sp.sender == self.data.admin)
+
+        # Transfer tokens, with one transfer call per token contract
+        sp.for item in transfers.items():
+            # Verify that sender is the admin, or a spender with enough allowance
+            sp.if ~is_admin:
+                sp.for tx in item.value:
+                    self.spend_allowance(
+                        sp.variant("fa2", sp.record(token_address=item.key, token_id=tx.token_id)),
+                        tx.amount,
+                    )
+
+            c = sp.contract(Fund.FA2_TRANSFER_TYPE, item.key, "transfer").open_some(Errors.INVALID_TOKEN_CONTRACT)
+            sp.transfer(sp.list([sp.record(from_=sp.self_address, txs=item.value)]), sp.mutez(0), c)
+
+    @sp.entry_point
+    def payout_batch(self, payments):
+        sp.set_type(payments, sp.TList(Fund.PAYMENT_TYPE))
+
+        is_admin = sp.compute(sp.sender == self.data.admin)
+
+        # Token payments are grouped per token contract, so that the transfer entrypoint of each contract is looked
+        # up once. FA2 contracts receive all their transfers in a single call.
+        fa12_txs = sp.local(
+            "fa12_txs",
+            sp.map(l={}, tkey=sp.TAddress, tvalue=sp.TList(sp.TRecord(to_=sp.TAddress, value=sp.TNat))),
+        )
+        fa2_txs = sp.local("fa2_txs", sp.map(l={}, tkey=sp.TAddress, tvalue=Fund.FA2_TRANSFER_TXS_TYPE))
+
+        sp.for payment in payments:
+            # Verify that sender is the admin, or a spender with enough allowance
+            sp.if ~is_admin:
+                self.spend_allowance(payment.asset, payment.amount)
+
+            with payment.asset.match_cases() as arg:
+                with arg.match("tez"):
+                    sp.send(payment.to_, sp.utils.nat_to_mutez(payment.amount))
+                with arg.match("fa12") as token_address:
+                    tx = sp.record(to_=payment.to_, value=payment.amount)
+                    sp.if fa12_txs.value.contains(token_address):
+                        fa12_txs.value[token_address].push(tx)
+                    sp.else:
+                        fa12_txs.value[token_address] = sp.list([tx])
+                with arg.match("fa2") as token:
+                    tx = sp.record(to_=payment.to_, token_id=token.token_id, amount=payment.amount)
+                    sp.if fa2_txs.value.contains(token.token_address):
+                        fa2_txs.value[token.token_address].push(tx)
+                    sp.else:
+                        fa2_txs.value[token.token_address] = sp.list([tx])
+
+        sp.for item in fa12_txs.value.items():
+            c = sp.contract(Fund.FA12_TRANSFER_TYPE, item.key, "transfer").open_some(Errors.INVALID_TOKEN_CONTRACT)
+            sp.for tx in item.value:
+                sp.transfer(sp.record(from_=sp.self_address, to_=tx.to_, value=tx.value), sp.mutez(0), c)
+
+        sp.for item in fa2_txs.value.items():
+            c = sp.contract(Fund.FA2_TRANSFER_TYPE, item.key, "transfer").open_some(Errors.INVALID_TOKEN_CONTRACT)
+            sp.transfer(sp.list([sp.record(from_=sp.self_address, txs=item.value)]), sp.mutez(0), c)
+
+    @sp.entry_point
+    def set_allowance(self, params):
+        sp.set_type(
+            params,
+            sp.TRecord(spender=sp.TAddress, asset=Fund.ASSET_TYPE, cap=sp.TNat, expiry=sp.TTimestamp).layout(
+                ("spender", ("asset", ("cap", "expiry")))
+            ),
+        )
+
+        # Verify that sender is the admin
+        sp.verify(sp.sender == self.data.admin, Errors.NOT_ALLOWED)
+
+        # A new allowance replaces the previous one of the spender for the asset. A cap of 0 revokes it.
+        sp.if params.cap == 0:
+            del self.data.allowances[(params.spender, params.asset)]
+        sp.else:
+            self.data.allowances[(params.spender, params.asset)] = sp.record(
+                cap=params.cap,
+                spent=0,
+                expiry=params.expiry,
+            )
+
+    # Verifies that the sender holds enough allowance for the transfer, and accounts the transfer against it
+    def spend_allowance(self, asset, amount):
+        key = sp.compute((sp.sender, asset))
+
+        sp.verify(self.data.allowances.contains(key), Errors.NOT_ALLOWED)
+
+        allowance = self.data.allowances[key]
+
+        sp.verify(sp.now <= allowance.expiry, Errors.ALLOWANCE_EXPIRED)
+        sp.verify(allowance.spent + amount <= allowance.cap, Errors.ALLOWANCE_EXCEEDED)
+
+        allowance.spent += amount
+
+    @sp.entry_point
+    def create_distribution(self, params):
+        sp.set_type(
+            params,
+            sp.TRecord(merkle_root=sp.TBytes, caps=sp.TMap(Fund.ASSET_TYPE, sp.TNat), expiry=sp.TTimestamp).layout(
+                ("merkle_root", ("caps", "expiry"))
+            ),
+        )
+
+        # Verify that sender is the admin
+        sp.verify(sp.sender == self.data.admin, Errors.NOT_ALLOWED)
+
+        self.data.distributions[self.data.num_distributions] = sp.record(
+            merkle_root=params.merkle_root,
+            caps=params.caps,
+            claimed=sp.map(l={}),
+            expiry=params.expiry,
+        )
+        self.data.num_distributions += 1
+
+    @sp.entry_point
+    def claim(self, params):
+        sp.set_type(
+            params,
+            sp.TRecord(
+                distribution_id=sp.TNat,
+                leaf=Fund.DISTRIBUTION_LEAF_TYPE,
+                proof=sp.TList(Fund.DISTRIBUTION_PROOF_STEP_TYPE),
+            ).layout(("distribution_id", ("leaf", "proof"))),
+        )
+
+        sp.verify(self.data.distributions.contains(params.distribution_id), Errors.INVALID_DISTRIBUTION_ID)
+
+        distribution = self.data.distributions[params.distribution_id]
+
+        sp.verify(sp.now <= distribution.expiry, Errors.DISTRIBUTION_EXPIRED)
+
+        # Fold the proof from the leaf up to the root
+        node = sp.local("node", sp.blake2b(sp.pack(params.leaf)))
+        sp.for step in params.proof:
+            sp.if step.is_left:
+                node.value = sp.blake2b(sp.pack((step.sibling, node.value)))
+            sp.else:
+                node.value = sp.blake2b(sp.pack((node.value, step.sibling)))
+        sp.verify(node.value == distribution.merkle_root, Errors.INVALID_PROOF)
+
+        # Each leaf is claimed once. A word of the bitmap covers BITMAP_WORD_SIZE consecutive leaves.
+        word_key = sp.compute((params.distribution_id, params.leaf.index // Fund.BITMAP_WORD_SIZE))
+        bit = sp.compute(sp.nat(1) << params.leaf.index % Fund.BITMAP_WORD_SIZE)
+        word = sp.compute(self.data.claimed.get(word_key, sp.nat(0)))
+        sp.verify((word // bit) % 2 == 0, Errors.ALREADY_CLAIMED)
+        self.data.claimed[word_key] = word + bit
+
+        # Claims of an asset are limited to its cap
+        claimed = distribution.claimed.get(params.leaf.asset, sp.nat(0)) + params.leaf.amount
+        sp.verify(claimed <= distribution.caps.get(params.leaf.asset, sp.nat(0)), Errors.DISTRIBUTION_CAP_EXCEEDED)
+        distribution.claimed[params.leaf.asset] = claimed
+
+        # Any address can claim on behalf of the recipient
+        self.pay(params.leaf.asset, params.leaf.recipient, params.leaf.amount)
+
+    @sp.entry_point
+    def create_stream(self, params):
+        sp.set_type(
+            params,
+            sp.TRecord(
+                recipient=sp.TAddress,
+                asset=Fund.ASSET_TYPE,
+                total=sp.TNat,
+                start=sp.TTimestamp,
+                end=sp.TTimestamp,
+                cliff=sp.TTimestamp,
+            ).layout(("recipient", ("asset", ("total", ("start", ("end", "cliff")))))),
+        )
+
+        # Verify that sender is the admin
+        sp.verify(sp.sender == self.data.admin, Errors.NOT_ALLOWED)
+
+        sp.verify(
+            (params.start < params.end) & (params.start <= params.cliff) & (params.cliff <= params.end),
+            Errors.INVALID_STREAM_PERIOD,
+        )
+
+        self.data.streams[self.data.num_streams] = sp.record(
+            recipient=params.recipient,
+            asset=params.asset,
+            total=params.total,
+            withdrawn=0,
+            start=params.start,
+            end=params.end,
+            cliff=params.cliff,
+        )
+        self.data.num_streams += 1
+
+    @sp.entry_point
+    def withdraw(self, stream_id):
+        sp.set_type(stream_id, sp.TNat)
+
+        sp.verify(self.data.streams.contains(stream_id), Errors.INVALID_STREAM_ID)
+
+        stream = self.data.streams[stream_id]
+
+        # Verify that sender is the recipient
+        sp.verify(sp.sender == stream.recipient, Errors.NOT_ALLOWED)
+
+        amount = sp.compute(sp.as_nat(self.vested(stream) - stream.withdrawn))
+        sp.verify(amount > 0, Errors.NOTHING_TO_WITHDRAW)
+
+        self.pay(stream.asset, stream.recipient, amount)
+
+        # A fully withdrawn stream is removed
+        sp.if stream.withdrawn + amount == stream.total:
+            del self.data.streams[stream_id]
+        sp.else:
+            stream.withdrawn += amount
+
+    @sp.entry_point
+    def cancel_stream(self, stream_id):
+        sp.set_type(stream_id, sp.TNat)
+
+        # Verify that sender is the admin
+        sp.verify(sp.sender == self.data.admin, Errors.NOT_ALLOWED)
+
+        sp.verify(self.data.streams.contains(stream_id), Errors.INVALID_STREAM_ID)
+
+        stream = self.data.streams[stream_id]
+
+        # The recipient keeps what has vested so far
+        amount = sp.compute(sp.as_nat(self.vested(stream) - stream.withdrawn))
+        sp.if amount > 0:
+            self.pay(stream.asset, stream.recipient, amount)
+
+        del self.data.streams[stream_id]
+
+    # Amount of a stream vested at the current timestamp
+    def vested(self, stream):
+        vested = sp.local("vested", sp.nat(0))
+        sp.if sp.now >= stream.end:
+            vested.value = stream.total
+        sp.else:
+            sp.if sp.now >= stream.cliff:
+                vested.value = (stream.total * sp.as_nat(sp.now - stream.start)) // sp.as_nat(stream.end - stream.start)
+        return vested.value
+
+    @sp.entry_point
+    def create_schedule(self, params):
+        sp.set_type(
+            params,
+            sp.TRecord(
+                recipient=sp.TAddress,
+                asset=Fund.ASSET_TYPE,
+                amount=sp.TNat,
+                interval=sp.TInt,
+                first_payment=sp.TTimestamp,
+                count=sp.TNat,
+            ).layout(("recipient", ("asset", ("amount", ("interval", ("first_payment", "count")))))),
+        )
+
+        # Verify that sender is the admin
+        sp.verify(sp.sender == self.data.admin, Errors.NOT_ALLOWED)
+
+        sp.verify((params.interval > 0) & (params.count > 0), Errors.INVALID_SCHEDULE)
+
+        self.data.schedules[self.data.num_schedules] = sp.record(
+            recipient=params.recipient,
+            asset=params.asset,
+            amount=params.amount,
+            interval=params.interval,
+            next_payment=params.first_payment,
+            remaining=params.count,
+        )
+        self.data.num_schedules += 1
+
+    @sp.entry_point
+    def cancel_schedule(self, schedule_id):
+        sp.set_type(schedule_id, sp.TNat)
+
+        # Verify that sender is the admin
+        sp.verify(sp.sender == self.data.admin, Errors.NOT_ALLOWED)
+
+        sp.verify(self.data.schedules.contains(schedule_id), Errors.INVALID_SCHEDULE_ID)
+
+        del self.data.schedules[schedule_id]
+
+    @sp.entry_point
+    def run_due(self, schedule_ids):
+        sp.set_type(schedule_ids, sp.TList(sp.TNat))
+
+        # Any address can run the due payments of the schedules it lists, so a keeper picks the due schedules off-chain
+        # and leaves out any it cannot pay. Unknown or not yet due schedules are skipped, and a schedule listed n times
+        # catches up to n overdue payments.
+        sp.for schedule_id in schedule_ids:
+            sp.if self.data.schedules.contains(schedule_id):
+                schedule = self.data.schedules[schedule_id]
+                sp.if sp.now >= schedule.next_payment:
+                    self.pay(schedule.asset, schedule.recipient, schedule.amount)
+
+                    # A schedule is removed with its last payment
+                    sp.if schedule.remaining == 1:
+                        del self.data.schedules[schedule_id]
+                    sp.else:
+                        schedule.remaining = sp.as_nat(schedule.remaining - 1)
+                        schedule.next_payment = schedule.next_payment.add_seconds(schedule.interval)
+
+    # Pays a single amount of an asset held by the fund
+    def pay(self, asset, to_, amount):
+        with asset.match_cases() as arg:
+            with arg.match("tez"):
+                sp.send(to_, sp.utils.nat_to_mutez(amount))
+            with arg.match("fa12") as token_address:
+                c = sp.contract(Fund.FA12_TRANSFER_TYPE, token_address, "transfer").open_some(
+                    Errors.INVALID_TOKEN_CONTRACT
+                )
+                sp.transfer(sp.record(from_=sp.self_address, to_=to_, value=amount), sp.mutez(0), c)
+            with arg.match("fa2") as token:
+                c = sp.contract(Fund.FA2_TRANSFER_TYPE, token.token_address, "transfer").open_some(
+                    Errors.INVALID_TOKEN_CONTRACT
+                )
+                sp.transfer(
+                    sp.list(
+                        [
+                            sp.record(
+                                from_=sp.self_address,
+                                txs=sp.list([sp.record(to_=to_, token_id=token.token_id, amount=amount)]),
+                            )
+                        ]
+                    ),
+                    sp.mutez(0),
+                    c,
+                )
+
     @sp.entry_point
     def set_delegate(self, new_delegate):
         sp.set_type(new_delegate, sp.TOption(sp.TKeyHash))
@@ -276,6 +609,634 @@ if __name__ == "__main__":
             exception=Errors.NOT_ALLOWED,
         )
 
+    ####################
+    # transfer_fa2_many
+    ####################
+
+    @sp.add_test(name="transfer_fa2_many transfers tokens of several FA2 contracts")
+    def test():
+        scenario = sp.test_scenario()
+
+        token_receiver = sp.test_account("receiver")
+
+        fa2_1 = FA2.FA2(
+            config=FA2.FA2_config(),
+            metadata=sp.utils.metadata_of_url("https://example.com"),
+            admin=Addresses.ADMIN,
+        )
+        fa2_2 = FA2.FA2(
+            config=FA2.FA2_config(),
+            metadata=sp.utils.metadata_of_url("https://example.com"),
+            admin=Addresses.ADMIN,
+        )
+        community_fund = CommunityFund()
+
+        scenario += fa2_1
+        scenario += fa2_2
+        scenario += community_fund
+
+        # Mint for community fund
+        scenario += fa2_1.mint(
+            address=community_fund.address,
+            amount=100,
+            metadata=FA2.FA2.make_metadata(name="NFT", decimals=18, symbol="NFT"),
+            token_id=0,
+        ).run(sender=Addresses.ADMIN)
+        scenario += fa2_2.mint(
+            address=community_fund.address,
+            amount=100,
+            metadata=FA2.FA2.make_metadata(name="NFT", decimals=18, symbol="NFT"),
+            token_id=0,
+        ).run(sender=Addresses.ADMIN)
+
+        # Transfer the tokens of both contracts to receiver
+        scenario += community_fund.transfer_fa2_many(
+            {
+                fa2_1.address: sp.list([sp.record(to_=token_receiver.address, token_id=0, amount=100)]),
+                fa2_2.address: sp.list([sp.record(to_=token_receiver.address, token_id=0, amount=50)]),
+            }
+        ).run(sender=Addresses.ADMIN)
+
+        # Verify correctness of transfer
+        scenario.verify(fa2_1.data.ledger[(token_receiver.address, 0)].balance == 100)
+        scenario.verify(fa2_2.data.ledger[(token_receiver.address, 0)].balance == 50)
+        scenario.verify(fa2_2.data.ledger[(community_fund.address, 0)].balance == 50)
+
+    @sp.add_test(name="transfer_fa2_many fails if not called by admin")
+    def test():
+        scenario = sp.test_scenario()
+
+        token_receiver = sp.test_account("receiver")
+
+        community_fund = CommunityFund()
+
+        scenario += community_fund
+
+        # ALICE tries to transfer fa2 tokens to receiver
+        scenario += community_fund.transfer_fa2_many(
+            {Addresses.TOKEN: sp.list([sp.record(to_=token_receiver.address, token_id=0, amount=100)])}
+        ).run(
+            sender=Addresses.ALICE,
+            valid=False,
+            exception=Errors.NOT_ALLOWED,
+        )
+
+    #############
+    # Allowances
+    #############
+
+    @sp.add_test(name="spenders transfer within their allowance")
+    def test():
+        scenario = sp.test_scenario()
+
+        fa12 = FA12.FA12(admin=Addresses.ADMIN)
+        community_fund = CommunityFund()
+        dummy = DummyStore.DummyStore(admin=Addresses.ADMIN)
+
+        community_fund.set_initial_balance(sp.tez(10))
+
+        scenario += fa12
+        scenario += community_fund
+        scenario += dummy
+
+        # Mint for community fund
+        scenario += fa12.mint(address=community_fund.address, value=100).run(sender=Addresses.ADMIN)
+
+        # Grant ALICE allowances of 2 tez and 50 tokens
+        scenario += community_fund.set_allowance(
+            spender=Addresses.ALICE,
+            asset=sp.variant("tez", sp.unit),
+            cap=2_000_000,
+            expiry=sp.timestamp(100),
+        ).run(sender=Addresses.ADMIN)
+        scenario += community_fund.set_allowance(
+            spender=Addresses.ALICE,
+            asset=sp.variant("fa12", fa12.address),
+            cap=50,
+            expiry=sp.timestamp(100),
+        ).run(sender=Addresses.ADMIN)
+
+        # ALICE transfers directly
+        scenario += community_fund.transfer_tez(value=sp.tez(1), dest=dummy.address).run(
+            sender=Addresses.ALICE,
+            now=sp.timestamp(1),
+        )
+        scenario += community_fund.transfer_fa12(token_address=fa12.address, value=50, dest=Addresses.BOB).run(
+            sender=Addresses.ALICE,
+            now=sp.timestamp(1),
+        )
+
+        # Verify correctness of the transfers and of the accounting
+        scenario.verify(dummy.balance == sp.tez(1))
+        scenario.verify(fa12.data.balances[Addresses.BOB].balance == 50)
+        tez_allowance = community_fund.data.allowances[(Addresses.ALICE, sp.variant("tez", sp.unit))]
+        scenario.verify(tez_allowance.spent == 1_000_000)
+
+        # The FA1.2 allowance is used up
+        scenario += community_fund.transfer_fa12(token_address=fa12.address, value=1, dest=Addresses.BOB).run(
+            sender=Addresses.ALICE,
+            now=sp.timestamp(1),
+            valid=False,
+            exception=Errors.ALLOWANCE_EXCEEDED,
+        )
+
+        # The tez allowance is expired
+        scenario += community_fund.transfer_tez(value=sp.tez(1), dest=dummy.address).run(
+            sender=Addresses.ALICE,
+            now=sp.timestamp(101),
+            valid=False,
+            exception=Errors.ALLOWANCE_EXPIRED,
+        )
+
+        # Allowances are per asset and per spender
+        scenario += community_fund.payout_batch(
+            [sp.record(asset=sp.variant("fa12", fa12.address), to_=Addresses.BOB, amount=1)]
+        ).run(sender=Addresses.BOB, now=sp.timestamp(1), valid=False, exception=Errors.NOT_ALLOWED)
+
+    @sp.add_test(name="set_allowance revokes an allowance with a cap of 0")
+    def test():
+        scenario = sp.test_scenario()
+
+        community_fund = CommunityFund()
+
+        scenario += community_fund
+
+        scenario += community_fund.set_allowance(
+            spender=Addresses.ALICE,
+            asset=sp.variant("tez", sp.unit),
+            cap=2_000_000,
+            expiry=sp.timestamp(100),
+        ).run(sender=Addresses.ADMIN)
+
+        # Only the admin can grant allowances
+        scenario += community_fund.set_allowance(
+            spender=Addresses.ALICE,
+            asset=sp.variant("tez", sp.unit),
+            cap=0,
+            expiry=sp.timestamp(100),
+        ).run(sender=Addresses.ALICE, valid=False, exception=Errors.NOT_ALLOWED)
+
+        scenario += community_fund.set_allowance(
+            spender=Addresses.ALICE,
+            asset=sp.variant("tez", sp.unit),
+            cap=0,
+            expiry=sp.timestamp(100),
+        ).run(sender=Addresses.ADMIN)
+
+        scenario.verify(~community_fund.data.allowances.contains((Addresses.ALICE, sp.variant("tez", sp.unit))))
+
+    ###############
+    # payout_batch
+    ###############
+
+    @sp.add_test(name="payout_batch pays tez, FA1.2 and FA2 tokens in a single call")
+    def test():
+        scenario = sp.test_scenario()
+
+        receiver_1 = sp.test_account("receiver_1")
+        receiver_2 = sp.test_account("receiver_2")
+
+        fa12 = FA12.FA12(admin=Addresses.ADMIN)
+        fa2 = FA2.FA2(
+            config=FA2.FA2_config(),
+            metadata=sp.utils.metadata_of_url("https://example.com"),
+            admin=Addresses.ADMIN,
+        )
+        community_fund = CommunityFund()
+        dummy = DummyStore.DummyStore(admin=Addresses.ADMIN)
+
+        community_fund.set_initial_balance(sp.tez(10))
+
+        scenario += fa12
+        scenario += fa2
+        scenario += community_fund
+        scenario += dummy
+
+        # Mint for community fund
+        scenario += fa12.mint(address=community_fund.address, value=100).run(sender=Addresses.ADMIN)
+        scenario += fa2.mint(
+            address=community_fund.address,
+            amount=100,
+            metadata=FA2.FA2.make_metadata(name="NFT", decimals=18, symbol="NFT"),
+            token_id=0,
+        ).run(sender=Addresses.ADMIN)
+        scenario += fa2.mint(
+            address=community_fund.address,
+            amount=100,
+            metadata=FA2.FA2.make_metadata(name="NFT", decimals=18, symbol="NFT"),
+            token_id=1,
+        ).run(sender=Addresses.ADMIN)
+
+        # Pay out a grant round
+        scenario += community_fund.payout_batch(
+            [
+                sp.record(asset=sp.variant("tez", sp.unit), to_=dummy.address, amount=4_000_000),
+                sp.record(asset=sp.variant("fa12", fa12.address), to_=receiver_1.address, amount=30),
+                sp.record(asset=sp.variant("fa12", fa12.address), to_=receiver_2.address, amount=20),
+                sp.record(
+                    asset=sp.variant("fa2", sp.record(token_address=fa2.address, token_id=0)),
+                    to_=receiver_1.address,
+                    amount=40,
+                ),
+                sp.record(
+                    asset=sp.variant("fa2", sp.record(token_address=fa2.address, token_id=1)),
+                    to_=receiver_2.address,
+                    amount=60,
+                ),
+            ]
+        ).run(sender=Addresses.ADMIN)
+
+        # Verify correctness of the payments
+        scenario.verify(dummy.balance == sp.tez(4))
+        scenario.verify(community_fund.balance == sp.tez(6))
+        scenario.verify(fa12.data.balances[receiver_1.address].balance == 30)
+        scenario.verify(fa12.data.balances[receiver_2.address].balance == 20)
+        scenario.verify(fa12.data.balances[community_fund.address].balance == 50)
+        scenario.verify(fa2.data.ledger[(receiver_1.address, 0)].balance == 40)
+        scenario.verify(fa2.data.ledger[(receiver_2.address, 1)].balance == 60)
+        scenario.verify(fa2.data.ledger[(community_fund.address, 1)].balance == 40)
+
+    @sp.add_test(name="payout_batch fails if not called by admin")
+    def test():
+        scenario = sp.test_scenario()
+
+        community_fund = CommunityFund()
+        dummy = DummyStore.DummyStore(admin=Addresses.ADMIN)
+
+        community_fund.set_initial_balance(sp.tez(10))
+
+        scenario += community_fund
+        scenario += dummy
+
+        # ALICE tries to pay out tez
+        scenario += community_fund.payout_batch(
+            [sp.record(asset=sp.variant("tez", sp.unit), to_=dummy.address, amount=1_000_000)]
+        ).run(sender=Addresses.ALICE, valid=False, exception=Errors.NOT_ALLOWED)
+
+    ################
+    # Distributions
+    ################
+
+    @sp.add_test(name="claim pays a leaf of a distribution once")
+    def test():
+        scenario = sp.test_scenario()
+
+        fa12 = FA12.FA12(admin=Addresses.ADMIN)
+        community_fund = CommunityFund()
+        dummy = DummyStore.DummyStore(admin=Addresses.ADMIN)
+
+        community_fund.set_initial_balance(sp.tez(10))
+
+        scenario += fa12
+        scenario += community_fund
+        scenario += dummy
+
+        # Mint for community fund
+        scenario += fa12.mint(address=community_fund.address, value=100).run(sender=Addresses.ADMIN)
+
+        # A two leaf tree
+        leaf_1 = sp.set_type_expr(
+            sp.record(index=0, recipient=dummy.address, asset=sp.variant("tez", sp.unit), amount=1_000_000),
+            Fund.DISTRIBUTION_LEAF_TYPE,
+        )
+        leaf_2 = sp.set_type_expr(
+            sp.record(index=1, recipient=Addresses.BOB, asset=sp.variant("fa12", fa12.address), amount=30),
+            Fund.DISTRIBUTION_LEAF_TYPE,
+        )
+        hash_1 = sp.blake2b(sp.pack(leaf_1))
+        hash_2 = sp.blake2b(sp.pack(leaf_2))
+
+        # Create the distribution
+        scenario += community_fund.create_distribution(
+            merkle_root=sp.blake2b(sp.pack((hash_1, hash_2))),
+            caps={sp.variant("tez", sp.unit): 1_000_000, sp.variant("fa12", fa12.address): 30},
+            expiry=sp.timestamp(100),
+        ).run(sender=Addresses.ADMIN)
+
+        # Any address can claim on behalf of the recipients
+        scenario += community_fund.claim(
+            distribution_id=0,
+            leaf=leaf_1,
+            proof=[sp.record(sibling=hash_2, is_left=False)],
+        ).run(sender=Addresses.ALICE, now=sp.timestamp(1))
+        scenario += community_fund.claim(
+            distribution_id=0,
+            leaf=leaf_2,
+            proof=[sp.record(sibling=hash_1, is_left=True)],
+        ).run(sender=Addresses.BOB, now=sp.timestamp(1))
+
+        # Verify correctness of the payments
+        scenario.verify(dummy.balance == sp.tez(1))
+        scenario.verify(fa12.data.balances[Addresses.BOB].balance == 30)
+        scenario.verify(community_fund.data.distributions[0].claimed[sp.variant("fa12", fa12.address)] == 30)
+
+        # A leaf cannot be claimed twice
+        scenario += community_fund.claim(
+            distribution_id=0,
+            leaf=leaf_1,
+            proof=[sp.record(sibling=hash_2, is_left=False)],
+        ).run(
+            sender=Addresses.ALICE,
+            now=sp.timestamp(1),
+            valid=False,
+            exception=Errors.ALREADY_CLAIMED,
+        )
+
+    @sp.add_test(name="claim fails for an invalid proof, an exceeded cap or an expired distribution")
+    def test():
+        scenario = sp.test_scenario()
+
+        community_fund = CommunityFund()
+
+        community_fund.set_initial_balance(sp.tez(10))
+
+        scenario += community_fund
+
+        leaf_1 = sp.set_type_expr(
+            sp.record(index=0, recipient=Addresses.ALICE, asset=sp.variant("tez", sp.unit), amount=1_000_000),
+            Fund.DISTRIBUTION_LEAF_TYPE,
+        )
+        leaf_2 = sp.set_type_expr(
+            sp.record(index=1, recipient=Addresses.BOB, asset=sp.variant("tez", sp.unit), amount=1_000_000),
+            Fund.DISTRIBUTION_LEAF_TYPE,
+        )
+        hash_1 = sp.blake2b(sp.pack(leaf_1))
+        hash_2 = sp.blake2b(sp.pack(leaf_2))
+
+        # The cap covers a single leaf
+        scenario += community_fund.create_distribution(
+            merkle_root=sp.blake2b(sp.pack((hash_1, hash_2))),
+            caps={sp.variant("tez", sp.unit): 1_000_000},
+            expiry=sp.timestamp(100),
+        ).run(sender=Addresses.ADMIN)
+
+        # Proof with the sibling on the wrong side
+        scenario += community_fund.claim(
+            distribution_id=0,
+            leaf=leaf_1,
+            proof=[sp.record(sibling=hash_2, is_left=True)],
+        ).run(
+            now=sp.timestamp(1),
+            valid=False,
+            exception=Errors.INVALID_PROOF,
+        )
+
+        scenario += community_fund.claim(
+            distribution_id=0,
+            leaf=leaf_1,
+            proof=[sp.record(sibling=hash_2, is_left=False)],
+        ).run(now=sp.timestamp(1))
+
+        scenario += community_fund.claim(
+            distribution_id=0,
+            leaf=leaf_2,
+            proof=[sp.record(sibling=hash_1, is_left=True)],
+        ).run(
+            now=sp.timestamp(1),
+            valid=False,
+            exception=Errors.DISTRIBUTION_CAP_EXCEEDED,
+        )
+
+        scenario += community_fund.claim(
+            distribution_id=0,
+            leaf=leaf_2,
+            proof=[sp.record(sibling=hash_1, is_left=True)],
+        ).run(
+            now=sp.timestamp(101),
+            valid=False,
+            exception=Errors.DISTRIBUTION_EXPIRED,
+        )
+
+        scenario += community_fund.claim(
+            distribution_id=1,
+            leaf=leaf_2,
+            proof=[sp.record(sibling=hash_1, is_left=True)],
+        ).run(
+            now=sp.timestamp(1),
+            valid=False,
+            exception=Errors.INVALID_DISTRIBUTION_ID,
+        )
+
+    @sp.add_test(name="create_distribution fails if not called by admin")
+    def test():
+        scenario = sp.test_scenario()
+
+        community_fund = CommunityFund()
+
+        scenario += community_fund
+
+        scenario += community_fund.create_distribution(
+            merkle_root=sp.bytes("0x00"),
+            caps={sp.variant("tez", sp.unit): 1_000_000},
+            expiry=sp.timestamp(100),
+        ).run(sender=Addresses.ALICE, valid=False, exception=Errors.NOT_ALLOWED)
+
+    ##########
+    # Streams
+    ##########
+
+    @sp.add_test(name="withdraw pays the amount vested since the last withdrawal")
+    def test():
+        scenario = sp.test_scenario()
+
+        fa12 = FA12.FA12(admin=Addresses.ADMIN)
+        community_fund = CommunityFund()
+
+        scenario += fa12
+        scenario += community_fund
+
+        # Mint for community fund
+        scenario += fa12.mint(address=community_fund.address, value=1_000).run(sender=Addresses.ADMIN)
+
+        # Stream 1,000 tokens to ALICE over 1,000 seconds, with a cliff at 100 seconds
+        scenario += community_fund.create_stream(
+            recipient=Addresses.ALICE,
+            asset=sp.variant("fa12", fa12.address),
+            total=1_000,
+            start=sp.timestamp(0),
+            end=sp.timestamp(1_000),
+            cliff=sp.timestamp(100),
+        ).run(sender=Addresses.ADMIN)
+
+        # Nothing can be withdrawn before the cliff
+        scenario += community_fund.withdraw(0).run(
+            sender=Addresses.ALICE,
+            now=sp.timestamp(99),
+            valid=False,
+            exception=Errors.NOTHING_TO_WITHDRAW,
+        )
+
+        scenario += community_fund.withdraw(0).run(sender=Addresses.ALICE, now=sp.timestamp(250))
+
+        scenario.verify(fa12.data.balances[Addresses.ALICE].balance == 250)
+        scenario.verify(community_fund.data.streams[0].withdrawn == 250)
+
+        # Only the recipient can withdraw
+        scenario += community_fund.withdraw(0).run(
+            sender=Addresses.BOB,
+            now=sp.timestamp(500),
+            valid=False,
+            exception=Errors.NOT_ALLOWED,
+        )
+
+        # The rest is withdrawn after the end, and the stream is removed
+        scenario += community_fund.withdraw(0).run(sender=Addresses.ALICE, now=sp.timestamp(2_000))
+
+        scenario.verify(fa12.data.balances[Addresses.ALICE].balance == 1_000)
+        scenario.verify(~community_fund.data.streams.contains(0))
+
+    @sp.add_test(name="cancel_stream pays the vested amount and removes the stream")
+    def test():
+        scenario = sp.test_scenario()
+
+        fa12 = FA12.FA12(admin=Addresses.ADMIN)
+        community_fund = CommunityFund()
+
+        scenario += fa12
+        scenario += community_fund
+
+        # Mint for community fund
+        scenario += fa12.mint(address=community_fund.address, value=1_000).run(sender=Addresses.ADMIN)
+
+        scenario += community_fund.create_stream(
+            recipient=Addresses.ALICE,
+            asset=sp.variant("fa12", fa12.address),
+            total=1_000,
+            start=sp.timestamp(0),
+            end=sp.timestamp(1_000),
+            cliff=sp.timestamp(0),
+        ).run(sender=Addresses.ADMIN)
+
+        # Only the admin can cancel
+        scenario += community_fund.cancel_stream(0).run(
+            sender=Addresses.ALICE,
+            now=sp.timestamp(400),
+            valid=False,
+            exception=Errors.NOT_ALLOWED,
+        )
+
+        scenario += community_fund.cancel_stream(0).run(sender=Addresses.ADMIN, now=sp.timestamp(400))
+
+        scenario.verify(fa12.data.balances[Addresses.ALICE].balance == 400)
+        scenario.verify(fa12.data.balances[community_fund.address].balance == 600)
+        scenario.verify(~community_fund.data.streams.contains(0))
+
+    @sp.add_test(name="create_stream fails for an invalid period")
+    def test():
+        scenario = sp.test_scenario()
+
+        community_fund = CommunityFund()
+
+        scenario += community_fund
+
+        # Cliff after the end
+        scenario += community_fund.create_stream(
+            recipient=Addresses.ALICE,
+            asset=sp.variant("tez", sp.unit),
+            total=1_000,
+            start=sp.timestamp(0),
+            end=sp.timestamp(1_000),
+            cliff=sp.timestamp(1_001),
+        ).run(sender=Addresses.ADMIN, valid=False, exception=Errors.INVALID_STREAM_PERIOD)
+
+    ############
+    # Schedules
+    ############
+
+    @sp.add_test(name="run_due pays the due payments of the schedules")
+    def test():
+        scenario = sp.test_scenario()
+
+        fa12 = FA12.FA12(admin=Addresses.ADMIN)
+        community_fund = CommunityFund()
+
+        scenario += fa12
+        scenario += community_fund
+
+        # Mint for community fund
+        scenario += fa12.mint(address=community_fund.address, value=1_000).run(sender=Addresses.ADMIN)
+
+        # Pay ALICE 10 tokens every 100 seconds, twice, and BOB 20 tokens every 100 seconds, three times
+        scenario += community_fund.create_schedule(
+            recipient=Addresses.ALICE,
+            asset=sp.variant("fa12", fa12.address),
+            amount=10,
+            interval=100,
+            first_payment=sp.timestamp(0),
+            count=2,
+        ).run(sender=Addresses.ADMIN)
+        scenario += community_fund.create_schedule(
+            recipient=Addresses.BOB,
+            asset=sp.variant("fa12", fa12.address),
+            amount=20,
+            interval=100,
+            first_payment=sp.timestamp(50),
+            count=3,
+        ).run(sender=Addresses.ADMIN)
+
+        # Only the payment of ALICE is due. Unknown schedules are skipped.
+        scenario += community_fund.run_due([0, 1, 7]).run(sender=Addresses.JOHN, now=sp.timestamp(0))
+
+        scenario.verify(fa12.data.balances[Addresses.ALICE].balance == 10)
+        scenario.verify(~fa12.data.balances.contains(Addresses.BOB))
+
+        # Both are due, but only the schedule of ALICE is listed
+        scenario += community_fund.run_due([0]).run(sender=Addresses.JOHN, now=sp.timestamp(100))
+
+        scenario.verify(fa12.data.balances[Addresses.ALICE].balance == 20)
+        scenario.verify(~fa12.data.balances.contains(Addresses.BOB))
+
+        # The schedule of ALICE is over
+        scenario.verify(~community_fund.data.schedules.contains(0))
+
+        scenario += community_fund.run_due([0, 1]).run(sender=Addresses.JOHN, now=sp.timestamp(100))
+
+        scenario.verify(fa12.data.balances[Addresses.BOB].balance == 20)
+        scenario.verify(community_fund.data.schedules[1].next_payment == sp.timestamp(150))
+        scenario.verify(community_fund.data.schedules[1].remaining == 2)
+
+        # BOB's schedule is listed twice, catching up the payments at 150 and 250
+        scenario += community_fund.run_due([1, 1]).run(sender=Addresses.JOHN, now=sp.timestamp(300))
+
+        scenario.verify(fa12.data.balances[Addresses.BOB].balance == 60)
+        scenario.verify(~community_fund.data.schedules.contains(1))
+
+    @sp.add_test(name="create_schedule and cancel_schedule can only be called by admin")
+    def test():
+        scenario = sp.test_scenario()
+
+        community_fund = CommunityFund()
+
+        scenario += community_fund
+
+        scenario += community_fund.create_schedule(
+            recipient=Addresses.ALICE,
+            asset=sp.variant("tez", sp.unit),
+            amount=1_000_000,
+            interval=100,
+            first_payment=sp.timestamp(0),
+            count=2,
+        ).run(sender=Addresses.ALICE, valid=False, exception=Errors.NOT_ALLOWED)
+
+        scenario += community_fund.create_schedule(
+            recipient=Addresses.ALICE,
+            asset=sp.variant("tez", sp.unit),
+            amount=1_000_000,
+            interval=100,
+            first_payment=sp.timestamp(0),
+            count=2,
+        ).run(sender=Addresses.ADMIN)
+
+        scenario += community_fund.cancel_schedule(0).run(
+            sender=Addresses.ALICE,
+            valid=False,
+            exception=Errors.NOT_ALLOWED,
+        )
+
+        scenario += community_fund.cancel_schedule(0).run(sender=Addresses.ADMIN)
+
+        scenario.verify(~community_fund.data.schedules.contains(0))
+
     ###############
     # set_delegate
     ###############
@@ -15,8 +15,11 @@ OUT_DIR=./test_outputs
 # Compilation directory
 COMP_DIR=./michelson
 
+# Directory of the contracts referencing global constants, and of the constants to register
+CONSTANTS_DIR=./michelson/constants
+
 # Array of files to compile.
-CONTRACTS_ARRAY=(fa12_token flow_dao community_fund)
+CONTRACTS_ARRAY=(fa12_token fa12_lite_token space_executor flow_dao community_fund governance_hub)
 
 # Ensure we have a SmartPy binary.
 if [ ! -f "$SMART_PY_CLI" ]; then
@@ -63,8 +66,19 @@ done
 echo "> Compilation Complete."
 echo ""
 
+# Extract repeated code of the contracts into global constants, keeping the size report of the extraction.
+echo "> [2 / 3] Extracting Global Constants."
+COMPILED_ARRAY=()
+for CONTRACT_NAME in ${CONTRACTS_ARRAY[@]}; do
+    COMPILED_ARRAY+=("$COMP_DIR/${CONTRACT_NAME}.tz")
+done
+mkdir -p $CONSTANTS_DIR
+python3 tools/global_constants.py ${COMPILED_ARRAY[@]} --out-dir $CONSTANTS_DIR | tee $CONSTANTS_DIR/size_report.txt
+echo "> Written to ${CONSTANTS_DIR}"
+echo ""
+
 # Remove other artifacts to reduce noise.
-echo "> [2 / 2] Cleaning up"
+echo "> [3 / 3] Cleaning up"
 rm -rf $OUT_DIR
 echo "> All tidied up."
 echo ""
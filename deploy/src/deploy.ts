@@ -1,7 +1,31 @@
 import { TezosToolkit } from "@taquito/taquito";
-import { loadContract, deployContract } from "./utils";
+import {
+  loadContract,
+  deployContract,
+  extractGlobalConstants,
+  loadGlobalConstants,
+  registerGlobalConstants,
+} from "./utils";
 import BigNumber from "bignumber.js";
 
+// Compiled contracts, written by compile.sh
+const MICHELSON_DIR = `${__dirname}/../../michelson`;
+
+// Contracts referencing global constants, and the constants to register
+const CONSTANTS_DIR = `${MICHELSON_DIR}/constants`;
+
+// Contracts compiled by compile.sh. The constants are extracted from all of them, so that the hashes match the ones
+// of compile.sh.
+const CONTRACTS = ["fa12_token", "fa12_lite_token", "space_executor", "flow_dao", "community_fund", "governance_hub"];
+
+// Finalised proposals can be archived 30 days after voting_end, as in flow_dao.py
+const RETENTION_PERIOD = 30 * 86400;
+
+// Aggregated tallies are disabled (empty posting window), as in flow_dao.py. The bond is in mutez.
+const TALLY_POSTING_PERIOD = 0;
+const TALLY_CHALLENGE_PERIOD = 86400;
+const TALLY_BOND = 100_000_000;
+
 export interface DeployParams {
   // Tezos interface
   Tezos: TezosToolkit;
@@ -24,11 +48,25 @@ export interface DeployParams {
 
 export const deploy = async (deployParams: DeployParams): Promise<void> => {
   try {
+    // The contracts reference the repeated parts of their code as global constants. They are extracted again from
+    // the compiled contracts, so that the deployed code and constants always match michelson/*.tz.
+    extractGlobalConstants(
+      `${__dirname}/../../tools`,
+      CONTRACTS.map((contract) => `${MICHELSON_DIR}/${contract}.tz`),
+      CONSTANTS_DIR
+    );
+
+    const constants = loadGlobalConstants(`${CONSTANTS_DIR}/constants.json`);
+
+    console.log(">>Registering Global Constants\n\n");
+
+    await registerGlobalConstants(constants, deployParams.Tezos);
+
     // Load FA1.2 token code
-    const tokenCode = loadContract(`${__dirname}/../../michelson/fa12_token.tz`);
+    const tokenCode = loadContract(`${CONSTANTS_DIR}/fa12_token.tz`);
 
     // Prepare storage for FA1.2 token
-    const tokenStorage = `(Pair (Pair (Pair "${deployParams.admin}" {}) (Pair {Elt "" 0x697066733a2f2f516d54683548646a6766735277357a73665136483776616a566f396356706e6258757872747679765451684a5450} False)) (Pair (Pair {} {}) (Pair {Elt 0 (Pair 0 {Elt "decimals" 0x3138; Elt "icon" 0x697066733a2f2f516d5436625843483343377348703867524a377638376e52687155544732753962664c45464c4a33684a457a4341; Elt "name" 0x4b69636b666c6f7720476f7665726e616e636520546f6b656e; Elt "symbol" 0x4b464c})} 0)))`;
+    const tokenStorage = `(Pair (Pair (Pair "${deployParams.admin}" {}) (Pair {Elt "" 0x697066733a2f2f516d54683548646a6766735277357a73665136483776616a566f396356706e6258757872747679765451684a5450} (Pair False {}))) (Pair (Pair 1 {}) (Pair {Elt 0 (Pair 0 {Elt "decimals" 0x3138; Elt "icon" 0x697066733a2f2f516d5436625843483343377348703867524a377638376e52687155544732753962664c45464c4a33684a457a4341; Elt "name" 0x4b69636b666c6f7720476f7665726e616e636520546f6b656e; Elt "symbol" 0x4b464c})} (Pair 0 {Elt 0 (Pair 0 0)}))))`;
 
     console.log(">>Deploying Token Contract\n\n");
 
@@ -38,10 +76,11 @@ export const deploy = async (deployParams: DeployParams): Promise<void> => {
     console.log(`Token Deployed at: ${tokenAddress}\n\n`);
 
     // Load DAO code
-    const daoCode = loadContract(`${__dirname}/../../michelson/flow_dao.tz`);
+    const daoCode = loadContract(`${CONSTANTS_DIR}/flow_dao.tz`);
 
-    // Prepare storage for DAO
-    const daoStorage = `(Pair (Pair (Pair (Pair ${deployParams.votingPeriod.toFixed()} (Pair ${deployParams.timelockPeriod.toFixed()} (Pair ${deployParams.quorumVotes.toFixed()} ${deployParams.proposalThreshold.toFixed()}))) {Elt "" 0x697066733a2f2f516d57736e50625166704b7573536f506d36777062426e414b61725068734736755769756561476755644b684d5a}) (Pair None {})) (Pair (Pair 0 "${tokenAddress}") (Pair 0 (Pair {} None))));`;
+    // Prepare storage for DAO. The token is the governance token of the root space, and spaces, the fast-track lane
+    // and snapshots are set up later through proposals.
+    const daoStorage = `(Pair (Pair (Pair (Pair {} {}) (Pair {} (Pair {} {Elt "" 0x697066733a2f2f516d57736e50625166704b7573536f506d36777062426e414b61725068734736755769756561476755644b684d5a}))) (Pair (Pair 1 None) (Pair {} (Pair ${RETENTION_PERIOD} {})))) (Pair (Pair (Pair {} {}) (Pair {Elt 0 (Pair (Pair ${deployParams.votingPeriod.toFixed()} (Pair ${deployParams.timelockPeriod.toFixed()} (Pair ${deployParams.quorumVotes.toFixed()} ${deployParams.proposalThreshold.toFixed()}))) (Pair "${tokenAddress}" (Pair None 0)))} (Pair 0 {}))) (Pair (Pair (Pair ${TALLY_POSTING_PERIOD} (Pair ${TALLY_CHALLENGE_PERIOD} ${TALLY_BOND})) {}) (Pair 0 (Pair {} None)))))`;
 
     console.log(">>Deploying DAO Contract\n\n");
 
@@ -51,10 +90,10 @@ export const deploy = async (deployParams: DeployParams): Promise<void> => {
     console.log(`DAO Deployed at: ${daoAddress}\n\n`);
 
     // Load Community Fund code
-    const communityFundCode = loadContract(`${__dirname}/../../michelson/community_fund.tz`);
+    const communityFundCode = loadContract(`${CONSTANTS_DIR}/community_fund.tz`);
 
     // Prepare Community Fund storage
-    const communityFundStorage = `"${daoAddress}"`;
+    const communityFundStorage = `(Pair (Pair (Pair "${daoAddress}" {}) (Pair {} {})) (Pair (Pair 0 0) (Pair 0 (Pair {} {}))))`;
 
     console.log(">>Deploying Community Fund Contract\n\n");
 
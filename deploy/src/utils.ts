@@ -1,4 +1,5 @@
 import { TezosToolkit } from "@taquito/taquito";
+import { execFileSync } from "child_process";
 import util from "util";
 import fs = require("fs");
 
@@ -8,6 +9,50 @@ export const loadContract = (filename: string): string => {
   return contract;
 };
 
+export interface GlobalConstant {
+  // expr... hash of the constant
+  hash: string;
+
+  // Micheline JSON value of the constant
+  value: any;
+}
+
+export const extractGlobalConstants = (tools: string, files: string[], outDir: string): void => {
+  for (const file of files) {
+    if (!fs.existsSync(file)) {
+      throw new Error(`${file} not found. Compile the contracts with compile.sh first.`);
+    }
+  }
+
+  // Rewrites the compiled contracts to reference their repeated code as global constants, and prints the size report
+  const report = execFileSync("python3", [`${tools}/global_constants.py`, ...files, "--out-dir", outDir]);
+  console.log(report.toString());
+};
+
+export const loadGlobalConstants = (filename: string): GlobalConstant[] => {
+  return JSON.parse(fs.readFileSync(filename).toString());
+};
+
+export const registerGlobalConstants = async (
+  constants: GlobalConstant[],
+  tezos: TezosToolkit
+): Promise<void> => {
+  for (const constant of constants) {
+    try {
+      const registerOp = await tezos.contract.registerGlobalConstant({ value: constant.value });
+
+      await registerOp.confirmation(1);
+      console.log(`Registered global constant: ${registerOp.globalConstantHash}`);
+    } catch (err) {
+      // A constant is registered only once, and is shared with earlier deployments
+      if (!JSON.stringify(err).includes("Expression_already_registered")) {
+        throw err;
+      }
+      console.log(`Global constant already registered: ${constant.hash}`);
+    }
+  }
+};
+
 export const deployContract = async (
   code: string,
   storage: string,
@@ -0,0 +1,258 @@
+# Fungible Assets - FA12 Lite
+# The FA1.2 token of fa12_token.py without balance history, for the snapshot mode of Flow-DAO
+
+# Transfers and mints record the level at which a balance (or the total supply) last changed, in place of a
+# snapshot. Historical balances are posted per proposal as a Merkle root by a snapshot service. The token keeps the
+# value of a balance (and of the total supply) at the start of the last two epochs in which it changed, and the
+# snapshot is checked against these checkpoints during its challenge window.
+
+import smartpy as sp
+
+Addresses = sp.io.import_script_from_url("file:helpers/addresses.py")
+Snapshot = sp.io.import_script_from_url("file:types/snapshot.py")
+Token = sp.io.import_script_from_url("file:fa12_token.py")
+
+# Levels per epoch, about a day with 15 second blocks
+EPOCH_LENGTH = 5760
+
+# Checkpoint of a value which has not changed since its creation
+EMPTY_CHECKPOINT = sp.record(epoch=sp.nat(0), value=sp.nat(0))
+
+# Balance record of the ledger, along with the level of its last change and the checkpoints of the last two epochs in
+# which it changed
+BALANCE_TYPE = sp.TRecord(
+    approvals=sp.TMap(sp.TAddress, sp.TNat),
+    balance=sp.TNat,
+    level=sp.TNat,
+    checkpoint=Snapshot.CHECKPOINT_TYPE,
+    previousCheckpoint=Snapshot.CHECKPOINT_TYPE,
+)
+
+
+class FA12Lite(
+    Token.FA12_mint,
+    Token.FA12_administrator,
+    Token.FA12_token_metadata,
+    Token.FA12_contract_metadata,
+    Token.FA12_core,
+):
+    def __init__(
+        self,
+        admin=Addresses.ADMIN,
+        token_metadata=Token.TOKEN_METADATA,
+        contract_metadata=Token.CONTRACT_METADATA,
+        epoch_length=EPOCH_LENGTH,
+    ):
+        self.init(
+            balances=sp.big_map(tvalue=BALANCE_TYPE),
+            totalSupply=0,
+            totalSupplyLevel=sp.nat(0),
+            totalSupplyCheckpoint=EMPTY_CHECKPOINT,
+            totalSupplyPreviousCheckpoint=EMPTY_CHECKPOINT,
+            epochLength=sp.nat(epoch_length),
+            mintingDisabled=False,
+            administrator=admin,
+        )
+
+        self.usingTokenMetadata = True
+        self.set_token_metadata(token_metadata)
+        self.set_contract_metadata(contract_metadata)
+
+    # Called by transfers and mints before the balances and the total supply change, so that a new checkpoint holds
+    # the value at the start of the current epoch
+    def addAddressIfNecessary(self, address):
+        with sp.if_(~self.data.balances.contains(address)):
+            self.data.balances[address] = sp.record(
+                balance=0,
+                approvals={},
+                level=0,
+                checkpoint=EMPTY_CHECKPOINT,
+                previousCheckpoint=EMPTY_CHECKPOINT,
+            )
+
+        epoch = sp.level // self.data.epochLength
+
+        balance = self.data.balances[address]
+        with sp.if_(balance.checkpoint.epoch < epoch):
+            balance.previousCheckpoint = balance.checkpoint
+            balance.checkpoint = sp.record(epoch=epoch, value=balance.balance)
+
+        with sp.if_(self.data.totalSupplyCheckpoint.epoch < epoch):
+            self.data.totalSupplyPreviousCheckpoint = self.data.totalSupplyCheckpoint
+            self.data.totalSupplyCheckpoint = sp.record(epoch=epoch, value=self.data.totalSupply)
+
+    # Records the level of the last balance change of an address. It updates the balance record written by the
+    # transfer or mint anyway, so no history is kept.
+    def takeSnapshot(self, address):
+        self.data.balances[address].level = sp.level
+
+    def takeTotalSupplySnapshot(self):
+        self.data.totalSupplyLevel = sp.level
+
+    # Current balance of an address, and the level at which it last changed
+    @sp.onchain_view()
+    def balanceInfo(self, address):
+        sp.set_type(address, sp.TAddress)
+
+        with sp.if_(self.data.balances.contains(address)):
+            balance = self.data.balances[address]
+            sp.result(
+                sp.set_type_expr(sp.record(balance=balance.balance, level=balance.level), Snapshot.BALANCE_INFO_TYPE)
+            )
+        with sp.else_():
+            sp.result(sp.set_type_expr(sp.record(balance=0, level=0), Snapshot.BALANCE_INFO_TYPE))
+
+    # Current total supply, and the level at which it last changed
+    @sp.onchain_view()
+    def totalSupplyInfo(self):
+        sp.result(
+            sp.set_type_expr(
+                sp.record(value=self.data.totalSupply, level=self.data.totalSupplyLevel),
+                Snapshot.TOTAL_SUPPLY_INFO_TYPE,
+            )
+        )
+
+    @sp.onchain_view()
+    def epochLength(self):
+        sp.result(self.data.epochLength)
+
+    # Balance of an address at the start of the epoch of a level, or none if the address changed in two later epochs
+    @sp.onchain_view()
+    def checkpointBalance(self, params):
+        sp.set_type(params, sp.TRecord(address=sp.TAddress, level=sp.TNat).layout(("address", "level")))
+
+        with sp.if_(self.data.balances.contains(params.address)):
+            balance = self.data.balances[params.address]
+            sp.result(
+                self.checkpointValue(
+                    balance.checkpoint,
+                    balance.previousCheckpoint,
+                    balance.balance,
+                    params.level // self.data.epochLength,
+                )
+            )
+        with sp.else_():
+            sp.result(sp.some(sp.nat(0)))
+
+    # Total supply at the start of the epoch of a level, or none if it changed in two later epochs
+    @sp.onchain_view()
+    def checkpointTotalSupply(self, level):
+        sp.set_type(level, sp.TNat)
+
+        sp.result(
+            self.checkpointValue(
+                self.data.totalSupplyCheckpoint,
+                self.data.totalSupplyPreviousCheckpoint,
+                self.data.totalSupply,
+                level // self.data.epochLength,
+            )
+        )
+
+    # Value at the start of an epoch, given its current value and the checkpoints of the last two epochs in which it
+    # changed
+    def checkpointValue(self, checkpoint, previousCheckpoint, current, epoch):
+        value = sp.local("value", sp.some(current))
+
+        with sp.if_(checkpoint.epoch == epoch):
+            value.value = sp.some(checkpoint.value)
+        with sp.if_(checkpoint.epoch > epoch):
+            # The value did not change between the two checkpoints
+            with sp.if_(previousCheckpoint.epoch < epoch):
+                value.value = sp.some(checkpoint.value)
+            with sp.if_(previousCheckpoint.epoch == epoch):
+                value.value = sp.some(previousCheckpoint.value)
+            with sp.if_(previousCheckpoint.epoch > epoch):
+                value.value = sp.none
+
+        return value.value
+
+
+if __name__ == "__main__":
+
+    ###########
+    # transfer
+    ###########
+
+    @sp.add_test(name="transfer records the level of the balance changes")
+    def test():
+        scenario = sp.test_scenario()
+
+        token = FA12Lite()
+
+        scenario += token
+
+        # Mint tokens for ALICE
+        scenario += token.mint(address=Addresses.ALICE, value=100).run(sender=Addresses.ADMIN, level=1)
+
+        scenario.verify(token.data.balances[Addresses.ALICE].level == 1)
+        scenario.verify(token.data.totalSupplyLevel == 1)
+
+        # ALICE transfers to BOB
+        scenario += token.transfer(from_=Addresses.ALICE, to_=Addresses.BOB, value=40).run(
+            sender=Addresses.ALICE,
+            level=3,
+        )
+
+        scenario.verify(token.data.balances[Addresses.ALICE].balance == 60)
+        scenario.verify(token.data.balances[Addresses.ALICE].level == 3)
+        scenario.verify(token.data.balances[Addresses.BOB].balance == 40)
+        scenario.verify(token.data.balances[Addresses.BOB].level == 3)
+
+        # The total supply did not change
+        scenario.verify(token.data.totalSupplyLevel == 1)
+
+    ##############
+    # balanceInfo
+    ##############
+
+    @sp.add_test(name="balanceInfo returns the balance and the level of its last change")
+    def test():
+        scenario = sp.test_scenario()
+
+        token = FA12Lite()
+
+        scenario += token
+
+        scenario += token.mint(address=Addresses.ALICE, value=100).run(sender=Addresses.ADMIN, level=2)
+
+        scenario.verify(token.balanceInfo(Addresses.ALICE) == sp.record(balance=100, level=2))
+        scenario.verify(token.balanceInfo(Addresses.BOB) == sp.record(balance=0, level=0))
+        scenario.verify(token.totalSupplyInfo() == sp.record(value=100, level=2))
+
+    ####################
+    # checkpointBalance
+    ####################
+
+    @sp.add_test(name="checkpointBalance returns the balance at the start of an epoch")
+    def test():
+        scenario = sp.test_scenario()
+
+        token = FA12Lite(epoch_length=10)
+
+        scenario += token
+
+        # ALICE receives 100 tokens in epoch 0, and transfers 20 to BOB in epochs 1 and 2
+        scenario += token.mint(address=Addresses.ALICE, value=100).run(sender=Addresses.ADMIN, level=5)
+        scenario += token.transfer(from_=Addresses.ALICE, to_=Addresses.BOB, value=20).run(
+            sender=Addresses.ALICE,
+            level=15,
+        )
+        scenario += token.transfer(from_=Addresses.ALICE, to_=Addresses.BOB, value=20).run(
+            sender=Addresses.ALICE,
+            level=25,
+        )
+
+        scenario.verify(token.checkpointBalance(sp.record(address=Addresses.ALICE, level=15)) == sp.some(100))
+        scenario.verify(token.checkpointBalance(sp.record(address=Addresses.ALICE, level=25)) == sp.some(80))
+        scenario.verify(token.checkpointBalance(sp.record(address=Addresses.ALICE, level=35)) == sp.some(60))
+        scenario.verify(token.checkpointBalance(sp.record(address=Addresses.BOB, level=15)) == sp.some(0))
+        scenario.verify(token.checkpointBalance(sp.record(address=Addresses.JOHN, level=15)) == sp.some(0))
+
+        # The values at the start of epoch 0 are overwritten by the changes in epochs 1 and 2
+        scenario.verify(token.checkpointBalance(sp.record(address=Addresses.ALICE, level=5)) == sp.none)
+        scenario.verify(token.checkpointTotalSupply(5) == sp.none)
+
+        scenario.verify(token.checkpointTotalSupply(15) == sp.some(100))
+        scenario.verify(token.checkpointTotalSupply(35) == sp.some(100))
+
+    sp.add_compilation_target("fa12_lite_token", FA12Lite())
@@ -8,6 +8,8 @@
 # with Kickflow's Flow-DAO
 # https://github.com/Hover-Labs/murmuration/blob/main/smart_contracts/token.py
 
+import json
+
 import smartpy as sp
 
 # CHANGED: Importing dummy addresses for testing
@@ -60,25 +62,50 @@ class FA12_common:
 
 # CHANGE: All sp.if, sp.else, sp.while are replaced with desugared version for auto-formatting
 
+# CHANGED: added the types of the ledger storage, so that the ledger can be shared with other contracts (see
+# governance_hub.py)
+BALANCE_TYPE = sp.TRecord(approvals=sp.TMap(sp.TAddress, sp.TNat), balance=sp.TNat)
+SNAPSHOT_TYPE = sp.TRecord(level=sp.TNat, balance=sp.TNat).layout(("level", "balance"))
+TOTAL_SUPPLY_SNAPSHOT_TYPE = sp.TRecord(level=sp.TNat, value=sp.TNat).layout(("level", "value"))
+
+LEDGER_STORAGE_TYPES = dict(
+    balances=sp.TBigMap(sp.TAddress, BALANCE_TYPE),
+    totalSupply=sp.TNat,
+    snapshots=sp.TBigMap(sp.TPair(sp.TAddress, sp.TNat), SNAPSHOT_TYPE),
+    numSnapshots=sp.TBigMap(sp.TAddress, sp.TNat),
+    totalSupplySnapshots=sp.TBigMap(sp.TNat, TOTAL_SUPPLY_SNAPSHOT_TYPE),
+    numTotalSupplySnapshots=sp.TNat,
+    mintingDisabled=sp.TBool,
+)
+
+
+# CHANGED: the initial ledger storage is built by a function, for the same reason
+def ledger_storage():
+    return dict(
+        balances=sp.big_map(tvalue=BALANCE_TYPE),
+        totalSupply=0,
+        # CHANGED: added snapshots BIGMAP
+        snapshots=sp.big_map(tkey=sp.TPair(sp.TAddress, sp.TNat), tvalue=SNAPSHOT_TYPE),
+        # CHANGED: added numSnapshots BIGMAP
+        numSnapshots=sp.big_map(tkey=sp.TAddress, tvalue=sp.TNat),
+        # CHANGED: added totalSupplySnapshots BIGMAP with a base snapshot
+        totalSupplySnapshots=sp.big_map(
+            l={0: sp.record(level=0, value=0)},
+            tkey=sp.TNat,
+            tvalue=TOTAL_SUPPLY_SNAPSHOT_TYPE,
+        ),
+        # CHANGED: added numTotalSupplySnapshots
+        numTotalSupplySnapshots=sp.nat(1),
+        # CHANGED: added mintingDisbaled
+        mintingDisabled=False,
+    )
+
 
 class FA12_core(sp.Contract, FA12_common):
     # CHANGED: removed config
     def __init__(self, **extra_storage):
         # CHANGED: removed config
-        self.init(
-            balances=sp.big_map(tvalue=sp.TRecord(approvals=sp.TMap(sp.TAddress, sp.TNat), balance=sp.TNat)),
-            totalSupply=0,
-            # CHANGED: added snapshots BIGMAP
-            snapshots=sp.big_map(
-                tkey=sp.TPair(sp.TAddress, sp.TNat),
-                tvalue=sp.TRecord(level=sp.TNat, balance=sp.TNat).layout(("level", "balance")),
-            ),
-            # CHANGED: added numSnapshots BIGMAP
-            numSnapshots=sp.big_map(tkey=sp.TAddress, tvalue=sp.TNat),
-            # CHANGED: added mintingDisbaled
-            mintingDisabled=False,
-            **extra_storage
-        )
+        self.init(**ledger_storage(), **extra_storage)
 
     @sp.entry_point
     def transfer(self, params):
@@ -179,35 +206,86 @@ class FA12_snapshot(FA12_core):
 
         sp.verify(params.level < sp.level, FA12_Error.BlockNotFinalized)
 
-        with sp.if_(~self.data.numSnapshots.contains(params.address)):
-            sp.result(sp.nat(0))
-        with sp.else_():
-            # If requested level is greater than last snapshot's level, return the last balance snapshot
-            with sp.if_(
-                params.level
-                >= self.data.snapshots[(params.address, sp.as_nat(self.data.numSnapshots[params.address] - 1))].level
-            ):
-                sp.result(
-                    self.data.snapshots[(params.address, sp.as_nat(self.data.numSnapshots[params.address] - 1))].balance
-                )
+        sp.result(self.findBalanceAt(params.address, params.level))
+
+    # CHANGED: added on-chain view so that contracts can read historical balances synchronously
+    @sp.onchain_view()
+    def balanceAt(self, params):
+        sp.set_type(params, sp.TRecord(address=sp.TAddress, level=sp.TNat).layout(("address", "level")))
+
+        sp.verify(params.level < sp.level, FA12_Error.BlockNotFinalized)
+
+        sp.result(self.findBalanceAt(params.address, params.level))
+
+    # CHANGED: added on-chain view for the total supply at a certain block level
+    @sp.onchain_view()
+    def totalSupplyAt(self, level):
+        sp.set_type(level, sp.TNat)
+
+        sp.verify(level < sp.level, FA12_Error.BlockNotFinalized)
+
+        sp.result(self.findTotalSupplyAt(level))
+
+    # Looks up the balance snapshot of an address that is valid at a certain block level
+    def findBalanceAt(self, address, level):
+        balance = sp.local("balance", sp.nat(0))
+
+        with sp.if_(self.data.numSnapshots.contains(address)):
+            index = self.searchSnapshots(
+                lambda i: self.data.snapshots[(address, i)].level,
+                self.data.numSnapshots[address],
+                level,
+            )
+            balance.value = self.data.snapshots[(address, index)].balance
+
+        return balance.value
+
+    # Looks up the total supply snapshot that is valid at a certain block level
+    def findTotalSupplyAt(self, level):
+        index = self.searchSnapshots(
+            lambda i: self.data.totalSupplySnapshots[i].level,
+            self.data.numTotalSupplySnapshots,
+            level,
+        )
+        return self.data.totalSupplySnapshots[index].value
+
+    # Finds the serial number of the snapshot that is valid at a certain block level, given the level
+    # of each snapshot (levelAt) and the number of snapshots (at least 1)
+    def searchSnapshots(self, levelAt, count, level):
+        # If requested level is greater than last snapshot's level, the last snapshot is valid
+        index = sp.local("index", sp.as_nat(count - 1))
+
+        with sp.if_(level < levelAt(index.value)):
+            # Binary search the appropriate snapshot
+            low = sp.local("low", sp.nat(0))
+            high = sp.local("high", sp.as_nat(count - 2))
+            mid = sp.local("mid", sp.nat(0))
+
+            with sp.while_((low.value < high.value) & (levelAt(mid.value) != level)):
+                mid.value = (low.value + high.value + 1) // 2
+                with sp.if_(levelAt(mid.value) > level):
+                    high.value = sp.as_nat(mid.value - 1)
+                with sp.if_(levelAt(mid.value) < level):
+                    low.value = mid.value
+            with sp.if_(levelAt(mid.value) == level):
+                index.value = mid.value
             with sp.else_():
-                # Binary search the appropriate snapshot
-                low = sp.local("low", sp.nat(0))
-                high = sp.local("high", sp.as_nat(self.data.numSnapshots[params.address] - 2))
-                mid = sp.local("mid", sp.nat(0))
-
-                with sp.while_(
-                    (low.value < high.value) & (self.data.snapshots[(params.address, mid.value)].level != params.level)
-                ):
-                    mid.value = (low.value + high.value + 1) // 2
-                    with sp.if_(self.data.snapshots[(params.address, mid.value)].level > params.level):
-                        high.value = sp.as_nat(mid.value - 1)
-                    with sp.if_(self.data.snapshots[(params.address, mid.value)].level < params.level):
-                        low.value = mid.value
-                with sp.if_(self.data.snapshots[(params.address, mid.value)].level == params.level):
-                    sp.result(self.data.snapshots[(params.address, mid.value)].balance)
-                with sp.else_():
-                    sp.result(self.data.snapshots[(params.address, low.value)].balance)
+                index.value = low.value
+
+        return index.value
+
+    # CHANGED: added total supply snapshots, taken the same way as the balance snapshots
+    def takeTotalSupplySnapshot(self):
+        last = sp.as_nat(self.data.numTotalSupplySnapshots - 1)
+
+        # If a snapshot is already taken at the same level, simply overwrite it
+        with sp.if_(self.data.totalSupplySnapshots[last].level == sp.level):
+            self.data.totalSupplySnapshots[last].value = self.data.totalSupply
+        with sp.else_():
+            self.data.totalSupplySnapshots[self.data.numTotalSupplySnapshots] = sp.record(
+                level=sp.level, value=self.data.totalSupply
+            )
+            self.data.numTotalSupplySnapshots += 1
 
 
 class FA12_mint(FA12_core):
@@ -223,6 +301,9 @@ class FA12_mint(FA12_core):
         # CHANGED: take snapshot of the address's balance
         self.takeSnapshot(params.address)
 
+        # CHANGED: take snapshot of the total supply
+        self.takeTotalSupplySnapshot()
+
     # CHANGED: added disable_mint entrypoint
     @sp.entry_point
     def disableMint(self):
@@ -611,6 +692,40 @@ if __name__ == "__main__":
         )
         scenario.verify(viewer.data.last.open_some() == sp.nat(40))
 
+    # CHANGED: added a test replaying the vectors shared with the simulator (tools/simulator.py)
+    @sp.add_test(name="getBalanceAt matches the shared test vectors")
+    def test():
+        with open("helpers/snapshot_vectors.json") as f:
+            vector = json.load(f)["ledger"]
+
+        scenario = sp.test_scenario()
+
+        token = FA12()
+        viewer = Viewer(sp.TNat)
+
+        scenario += token
+        scenario += viewer
+
+        for operation in vector["operations"]:
+            if operation["kind"] == "mint":
+                scenario += token.mint(address=getattr(Addresses, operation["to"]), value=operation["amount"]).run(
+                    sender=Addresses.ADMIN,
+                    level=operation["level"],
+                )
+            else:
+                scenario += token.transfer(
+                    from_=getattr(Addresses, operation["from"]),
+                    to_=getattr(Addresses, operation["to"]),
+                    value=operation["amount"],
+                ).run(sender=getattr(Addresses, operation["from"]), level=operation["level"])
+
+        for query in vector["balances"]:
+            scenario += token.getBalanceAt(
+                (sp.record(level=query["level"], address=getattr(Addresses, query["address"])), viewer.typed.target)
+            ).run(level=vector["level"])
+
+            scenario.verify(viewer.data.last.open_some() == sp.nat(query["balance"]))
+
     ##############################
     # Transfer tests for snapshots
     ##############################
@@ -859,6 +974,29 @@ if __name__ == "__main__":
         scenario.verify(token.data.snapshots[(Addresses.ALICE, 3)].balance == 300)
         scenario.verify(token.data.snapshots[(Addresses.ALICE, 3)].level == 5)
 
+    @sp.add_test(name="total supply snapshots are taken correctly for multiple mints")
+    def test():
+        scenario = sp.test_scenario()
+
+        token = FA12()
+
+        scenario += token
+
+        # Mint tokens at two levels, twice at the second one
+        scenario += token.mint(address=Addresses.ALICE, value=100).run(sender=Addresses.ADMIN, level=1)
+
+        scenario += token.mint(address=Addresses.BOB, value=100).run(sender=Addresses.ADMIN, level=3)
+
+        scenario += token.mint(address=Addresses.ALICE, value=100).run(sender=Addresses.ADMIN, level=3)
+
+        # Verify number of snapshots
+        scenario.verify(token.data.numTotalSupplySnapshots == 3)  # Base + 2 levels
+
+        # Total supply has correct history
+        scenario.verify(token.data.totalSupplySnapshots[0] == sp.record(level=0, value=0))
+        scenario.verify(token.data.totalSupplySnapshots[1] == sp.record(level=1, value=100))
+        scenario.verify(token.data.totalSupplySnapshots[2] == sp.record(level=3, value=300))
+
     @sp.add_test(name="not allowed to mint when minting is disabled")
     def test():
         scenario = sp.test_scenario()
@@ -0,0 +1,284 @@
+import smartpy as sp
+
+Addresses = sp.io.import_script_from_url("file:helpers/addresses.py")
+Proposal = sp.io.import_script_from_url("file:types/proposal.py")
+DAO = sp.io.import_script_from_url("file:types/dao.py")
+Errors = sp.io.import_script_from_url("file:types/errors.py")
+Token = sp.io.import_script_from_url("file:fa12_token.py")
+FlowDAO = sp.io.import_script_from_url("file:flow_dao.py")
+DummyStore = sp.io.import_script_from_url("file:helpers/dummy_store.py")
+Trace = sp.io.import_script_from_url("file:helpers/trace.py")
+
+# Type of the token_metadata BIGMAP set by FA12_token_metadata
+TOKEN_METADATA_TYPE = sp.TBigMap(
+    sp.TNat,
+    sp.TRecord(token_id=sp.TNat, token_info=sp.TMap(sp.TString, sp.TBytes)),
+)
+
+###########
+# Contract
+###########
+
+
+class GovernanceHub(Token.FA12, FlowDAO.FlowDAO):
+    def __init__(
+        self,
+        admin=Addresses.ADMIN,
+        governance_parameters=FlowDAO.GOVERNANCE_PARAMETERS,
+        token_metadata=Token.TOKEN_METADATA,
+        contract_metadata=Token.CONTRACT_METADATA,
+    ):
+        # The snapshot ledger of the token and the proposal engine of the DAO share a single storage. The root space
+        # always votes with the ledger of the hub, so its token address is never read.
+        FlowDAO.FlowDAO.__init__(
+            self,
+            governance_parameters=governance_parameters,
+            extra_storage_types=dict(
+                Token.LEDGER_STORAGE_TYPES,
+                administrator=sp.TAddress,
+                token_metadata=TOKEN_METADATA_TYPE,
+            ),
+            administrator=admin,
+            **Token.ledger_storage()
+        )
+
+        # Wallets read the metadata of the token
+        self.usingTokenMetadata = True
+        self.set_token_metadata(token_metadata)
+        self.set_contract_metadata(contract_metadata)
+
+    # True if the voting power of a space is read from the ledger of the hub. It is for the root space, and for the
+    # spaces created with the address of the hub as their token.
+    def reads_own_ledger(self, space_id):
+        return (space_id == DAO.ROOT_SPACE_ID) | (self.data.spaces[space_id].token_address == sp.self_address)
+
+    # Registers the proposals right away if the space reads the ledger of the hub, instead of requesting the balance
+    # snapshot of the sender from the token of the space
+    def request_proposal_registration(self, space_id, proposals, fast_track):
+        sp.verify(self.data.spaces.contains(space_id), Errors.INVALID_SPACE_ID)
+
+        sp.if self.reads_own_ledger(space_id):
+            # Check balance snapshot of previous level to avoid flash loan usage
+            balance = self.findBalanceAt(sp.sender, sp.as_nat(sp.level - 1))
+            self.add_proposals(sp.sender, space_id, proposals, fast_track, balance)
+        sp.else:
+            FlowDAO.FlowDAO.request_proposal_registration(self, space_id, proposals, fast_track)
+
+    # Records the vote right away if the space reads the ledger of the hub
+    def request_vote(self, proposal_id, vote_value):
+        proposal = self.data.proposals[proposal_id]
+
+        sp.if self.reads_own_ledger(proposal.space_id):
+            # Check balance snapshot of the level before proposal origin to avoid flash loan usage
+            balance = self.findBalanceAt(sp.sender, sp.as_nat(proposal.origin_level - 1))
+            sp.verify(balance > 0, Errors.INVALID_VOTE)
+
+            self.record_ballot(sp.sender, proposal_id, vote_value, balance)
+        sp.else:
+            FlowDAO.FlowDAO.request_vote(self, proposal_id, vote_value)
+
+    def balance_at(self, space_id, address, level):
+        balance = sp.local("voting_power", sp.nat(0))
+
+        sp.if self.reads_own_ledger(space_id):
+            balance.value = self.findBalanceAt(address, level)
+        sp.else:
+            balance.value = FlowDAO.FlowDAO.balance_at(self, space_id, address, level)
+
+        return balance.value
+
+    def total_supply_at(self, space_id, level):
+        total_supply = sp.local("total_supply", sp.none, t=sp.TOption(sp.TNat))
+
+        sp.if self.reads_own_ledger(space_id):
+            total_supply.value = sp.some(self.findTotalSupplyAt(level))
+        sp.else:
+            total_supply.value = FlowDAO.FlowDAO.total_supply_at(self, space_id, level)
+
+        return total_supply.value
+
+
+if __name__ == "__main__":
+
+    ###########
+    # transfer
+    ###########
+
+    @sp.add_test(name="transfer keeps the FA1.2 interface of the token")
+    def test():
+        scenario = sp.test_scenario()
+
+        hub = GovernanceHub()
+
+        scenario += hub
+
+        # Mint tokens for ALICE
+        scenario += hub.mint(address=Addresses.ALICE, value=100).run(sender=Addresses.ADMIN, level=1)
+
+        # ALICE transfers to BOB
+        scenario += hub.transfer(from_=Addresses.ALICE, to_=Addresses.BOB, value=40).run(
+            sender=Addresses.ALICE,
+            level=2,
+        )
+
+        scenario.verify(hub.data.balances[Addresses.ALICE].balance == 60)
+        scenario.verify(hub.data.balances[Addresses.BOB].balance == 40)
+
+        # Verify the snapshots of BOB
+        scenario.verify(hub.data.numSnapshots[Addresses.BOB] == 2)
+        scenario.verify(hub.data.snapshots[(Addresses.BOB, 1)] == sp.record(level=2, balance=40))
+
+    ####################
+    # register_proposal
+    ####################
+
+    @sp.add_test(name="register_proposal reads the balance snapshot from the ledger of the hub")
+    def test():
+        scenario = sp.test_scenario()
+
+        hub = GovernanceHub()
+
+        # Create dummy store with the hub as admin
+        dummy_store = DummyStore.DummyStore(hub.address)
+
+        scenario += hub
+        scenario += dummy_store
+
+        # Mint tokens for ALICE
+        scenario += hub.mint(address=Addresses.ALICE, value=50_000 * FlowDAO.DECIMALS).run(
+            sender=Addresses.ADMIN,
+            level=1,
+        )
+
+        # The lambda for the proposal
+        def proposal_lambda(unit_param):
+            sp.set_type(unit_param, sp.TUnit)
+            c = sp.contract(sp.TNat, dummy_store.address, "modify_value").open_some()
+            sp.result([sp.transfer_operation(sp.nat(5), sp.mutez(0), c)])
+
+        # ALICE registers a proposal at level 2
+        scenario += hub.register_proposal(
+            space_id=0, proposal_metadata=sp.bytes("0x1220aa"), proposal_lambda=proposal_lambda
+        ).run(sender=Addresses.ALICE, level=2, now=sp.timestamp(0))
+
+        # Verify that the proposal got registered without a callback
+        scenario.verify(hub.data.proposals[1].creator == Addresses.ALICE)
+        scenario.verify(hub.data.proposals[1].status == Proposal.PROPOSAL_STATUS_VOTING)
+        scenario.verify(hub.data.state == FlowDAO.STATE_IDLE)
+        scenario.verify(hub.data.proposal_buffer.is_none())
+
+    @sp.add_test(name="register_proposal fails if the balance snapshot in the hub is insufficient")
+    def test():
+        scenario = sp.test_scenario()
+
+        hub = GovernanceHub()
+
+        scenario += hub
+
+        # Mint tokens for ALICE
+        scenario += hub.mint(address=Addresses.ALICE, value=49_999 * FlowDAO.DECIMALS).run(
+            sender=Addresses.ADMIN,
+            level=1,
+        )
+
+        scenario += hub.register_proposal(
+            space_id=0,
+            proposal_metadata=sp.bytes("0x1220aa"),
+            proposal_lambda=sp.build_lambda(lambda x: sp.list(l=[], t=sp.TOperation)),
+        ).run(sender=Addresses.ALICE, level=2, valid=False, exception=Errors.NOT_ENOUGH_TOKENS)
+
+    #######
+    # vote
+    #######
+
+    @sp.add_test(name="vote records the balance snapshot and end_voting reads the total supply of the hub")
+    def test():
+        scenario = sp.test_scenario()
+
+        hub = GovernanceHub()
+
+        scenario += hub
+
+        # Mint tokens for ALICE and BOB
+        scenario += hub.mint(address=Addresses.ALICE, value=150_000 * FlowDAO.DECIMALS).run(
+            sender=Addresses.ADMIN,
+            level=1,
+        )
+        scenario += hub.mint(address=Addresses.BOB, value=60_000 * FlowDAO.DECIMALS).run(
+            sender=Addresses.ADMIN,
+            level=1,
+        )
+
+        # ALICE registers a proposal at level 2
+        scenario += hub.register_proposal(
+            space_id=0,
+            proposal_metadata=sp.bytes("0x1220aa"),
+            proposal_lambda=sp.build_lambda(lambda x: sp.list(l=[], t=sp.TOperation)),
+        ).run(sender=Addresses.ALICE, level=2, now=sp.timestamp(0))
+
+        # ALICE transfers her tokens to JOHN after the proposal is registered
+        scenario += hub.transfer(from_=Addresses.ALICE, to_=Addresses.JOHN, value=150_000 * FlowDAO.DECIMALS).run(
+            sender=Addresses.ALICE,
+            level=3,
+        )
+
+        # ALICE and BOB up-vote with their balance at level 1
+        scenario += hub.vote(proposal_id=1, vote_value=Proposal.VOTE_VALUE_UPVOTE).run(
+            sender=Addresses.ALICE,
+            level=4,
+            now=sp.timestamp(5),
+        )
+        scenario += hub.vote(proposal_id=1, vote_value=Proposal.VOTE_VALUE_UPVOTE).run(
+            sender=Addresses.BOB,
+            level=4,
+            now=sp.timestamp(5),
+        )
+
+        scenario.verify(hub.data.proposals[1].up_votes == 210_000 * FlowDAO.DECIMALS)
+        scenario.verify(hub.data.state == FlowDAO.STATE_IDLE)
+        scenario.verify(hub.data.voting_buffer.is_none())
+
+        # JOHN held no tokens at level 1
+        scenario += hub.vote(proposal_id=1, vote_value=Proposal.VOTE_VALUE_DOWNVOTE).run(
+            sender=Addresses.JOHN,
+            level=4,
+            now=sp.timestamp(5),
+            valid=False,
+            exception=Errors.INVALID_VOTE,
+        )
+
+        # The up-votes are all of the total supply at level 1, so voting ends early
+        scenario += hub.end_voting(1).run(level=5, now=sp.timestamp(10))
+
+        scenario.verify(hub.data.proposals[1].status == Proposal.PROPOSAL_STATUS_TIMELOCKED)
+
+    ############
+    # gas trace
+    ############
+
+    @sp.add_test(name="the gas trace replays with the same outcome on the hub and on the two-contract setup")
+    def test():
+        # The trace of docs/governance_hub.md, replayed by tools/mockup_runner.py to compare the gas of both setups
+        operations = Trace.load("helpers/hub_gas_trace.jsonl")
+
+        scenario = sp.test_scenario()
+
+        hub = GovernanceHub()
+        token = Token.FA12()
+        dao = FlowDAO.FlowDAO(token_address=token.address)
+
+        scenario += hub
+        scenario += token
+        scenario += dao
+
+        Trace.replay(scenario, operations, hub, hub)
+        Trace.replay(scenario, operations, token, dao)
+
+        # Balances at level 2: ALICE 135_000, BOB 70_000 and JOHN 45_000
+        for contract in [hub, dao]:
+            scenario.verify(contract.data.proposals[1].up_votes == 205_000)
+            scenario.verify(contract.data.proposals[1].down_votes == 45_000)
+            scenario.verify(contract.data.proposals[2].up_votes == 45_000)
+            scenario.verify(contract.data.proposals[2].down_votes == 135_000)
+
+    sp.add_compilation_target("governance_hub", GovernanceHub())
@@ -14,3 +14,8 @@ class DummyToken(sp.Contract):
     def getBalanceAt(self, params):
         sp.set_type(params, sp.TRecord(address=sp.TAddress, level=sp.TNat))
         sp.result(self.data.val)
+
+    @sp.onchain_view()
+    def balanceAt(self, params):
+        sp.set_type(params, sp.TRecord(address=sp.TAddress, level=sp.TNat))
+        sp.result(self.data.val)
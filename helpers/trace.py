@@ -0,0 +1,55 @@
+import json
+
+import smartpy as sp
+
+Addresses = sp.io.import_script_from_url("file:helpers/addresses.py")
+Errors = sp.io.import_script_from_url("file:types/errors.py")
+
+# Seconds per level, as assumed by tools/workload.py
+BLOCK_TIME = 15
+
+
+def load(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Addresses of a trace are either tz1 addresses or the names of helpers/addresses.py
+def address(value):
+    if hasattr(Addresses, value):
+        return getattr(Addresses, value)
+    return sp.address(value)
+
+
+# Replays the operations of a trace (see tools/workload.py) on a token and a DAO with the same voting period as the
+# trace. Each level is block_time seconds after the previous one. An operation carrying an error is expected to fail
+# with it.
+def replay(scenario, operations, token, dao=None, block_time=BLOCK_TIME):
+    for operation in operations:
+        kind, level = operation["kind"], operation["level"]
+        run = dict(level=level, now=sp.timestamp(level * block_time))
+        if "error" in operation:
+            run.update(valid=False, exception=getattr(Errors, operation["error"]))
+
+        if kind == "mint":
+            scenario += token.mint(address=address(operation["to"]), value=operation["amount"]).run(
+                sender=Addresses.ADMIN, **run
+            )
+        elif kind == "transfer":
+            scenario += token.transfer(
+                from_=address(operation["from"]), to_=address(operation["to"]), value=operation["amount"]
+            ).run(sender=address(operation["from"]), **run)
+        elif kind == "propose":
+            scenario += dao.register_proposal(
+                space_id=0,
+                proposal_metadata=sp.bytes("0x1220aa"),
+                proposal_lambda=sp.build_lambda(lambda x: sp.list(l=[], t=sp.TOperation)),
+            ).run(sender=address(operation["creator"]), **run)
+        elif kind == "vote":
+            scenario += dao.vote(proposal_id=operation["proposal"], vote_value=operation["vote_value"]).run(
+                sender=address(operation["voter"]), **run
+            )
+        elif kind == "end_voting":
+            scenario += dao.end_voting(operation["proposal"]).run(**run)
+        else:
+            raise ValueError("Unsupported operation: " + kind)
@@ -0,0 +1,78 @@
+import smartpy as sp
+
+Addresses = sp.io.import_script_from_url("file:helpers/addresses.py")
+Proposal = sp.io.import_script_from_url("file:types/proposal.py")
+Errors = sp.io.import_script_from_url("file:types/errors.py")
+DummyStore = sp.io.import_script_from_url("file:helpers/dummy_store.py")
+
+###########
+# Contract
+###########
+
+
+class SpaceExecutor(sp.Contract):
+    def __init__(self, dao=Addresses.ADMIN):
+        # The DAO originates the executor of a space through deploy_space_executor, and forwards the lambdas of the
+        # space's passing proposals to it. Lambdas of a space never run with the authority of the DAO itself.
+        self.init_type(sp.TRecord(dao=sp.TAddress))
+        self.init(dao=dao)
+
+    @sp.entry_point
+    def execute(self, proposal_lambda):
+        sp.set_type(proposal_lambda, Proposal.PROPOSAL_LAMBDA)
+
+        # Verify that sender is the DAO
+        sp.verify(sp.sender == self.data.dao, Errors.NOT_ALLOWED)
+
+        # Run the lambda with the authority of the executor
+        operations = proposal_lambda(sp.unit)
+        sp.set_type(operations, sp.TList(sp.TOperation))
+        sp.add_operations(operations)
+
+    @sp.entry_point
+    def default(self):
+        pass
+
+
+if __name__ == "__main__":
+
+    ##########
+    # execute
+    ##########
+
+    @sp.add_test(name="execute runs the lambda with the authority of the executor")
+    def test():
+        scenario = sp.test_scenario()
+
+        executor = SpaceExecutor()
+        dummy_store = DummyStore.DummyStore(admin=executor.address)
+
+        scenario += executor
+        scenario += dummy_store
+
+        def proposal_lambda(unit_param):
+            sp.set_type(unit_param, sp.TUnit)
+            c = sp.contract(sp.TNat, dummy_store.address, "modify_value").open_some()
+            sp.result([sp.transfer_operation(sp.nat(5), sp.mutez(0), c)])
+
+        # Call execute
+        scenario += executor.execute(proposal_lambda).run(sender=Addresses.ADMIN)
+
+        scenario.verify(dummy_store.data.value == 5)
+
+    @sp.add_test(name="execute fails if not called by the DAO")
+    def test():
+        scenario = sp.test_scenario()
+
+        executor = SpaceExecutor()
+
+        scenario += executor
+
+        # Call execute
+        scenario += executor.execute(sp.build_lambda(lambda x: sp.list(l=[], t=sp.TOperation))).run(
+            sender=Addresses.ALICE,
+            valid=False,
+            exception=Errors.NOT_ALLOWED,
+        )
+
+    sp.add_compilation_target("space_executor", SpaceExecutor())
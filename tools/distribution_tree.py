@@ -0,0 +1,118 @@
+"""Builds the Merkle tree and claim proofs of a CommunityFund distribution.
+
+The input is a CSV file with a header row and the columns recipient, asset and amount-
+
+    recipient,asset,amount
+    tz1...,tez,1000000
+    tz1...,fa12:KT1...,500000000000000000000
+    tz1...,fa2:KT1...:3,10
+
+Amounts are in mutez for tez and in the smallest unit of the token otherwise. Leaves are indexed in the order of the
+rows, and hashed as the packed DISTRIBUTION_LEAF_TYPE value (see types/fund.py). A parent node hashes the packed pair
+of the hashes of its children, and the last node of a level with an odd number of nodes is carried up unchanged.
+
+The output is a JSON object with the merkle_root and caps to pass to create_distribution, and the parameters of the
+claim entrypoint for every leaf-
+
+    {"merkle_root": "...", "caps": [{"asset": "tez", "amount": 1000000}, ...], "claims": [{"leaf": ..., "proof": ...}]}
+
+Usage:
+
+    $ python tools/distribution_tree.py rewards.csv > distribution.json
+"""
+
+import argparse
+import csv
+import json
+
+import micheline
+
+
+def asset_value(asset):
+    """Micheline value of an asset, following the layout of ASSET_TYPE."""
+    parts = asset.split(":")
+    if parts[0] == "tez":
+        return {"prim": "Left", "args": [{"prim": "Unit"}]}
+    if parts[0] == "fa12":
+        return {"prim": "Right", "args": [{"prim": "Left", "args": [micheline.address(parts[1])]}]}
+    if parts[0] == "fa2":
+        token = micheline.pair(micheline.address(parts[1]), micheline.nat(int(parts[2])))
+        return {"prim": "Right", "args": [{"prim": "Right", "args": [token]}]}
+    raise ValueError("Unsupported asset: " + asset)
+
+
+def leaf_hash(index, recipient, asset, amount):
+    """Hash of a leaf node, following the layout of DISTRIBUTION_LEAF_TYPE."""
+    leaf = micheline.pair(
+        micheline.nat(index),
+        micheline.address(recipient),
+        asset_value(asset),
+        micheline.nat(amount),
+    )
+    return micheline.blake2b(micheline.pack(leaf))
+
+
+def parent_hash(left, right):
+    return micheline.blake2b(micheline.pack(micheline.pair(micheline.raw_bytes(left), micheline.raw_bytes(right))))
+
+
+def build_tree(hashes):
+    """Returns the levels of the tree, from the leaves up to the root."""
+    levels = [hashes]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [parent_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2 == 1:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def proof(levels, index):
+    """Proof steps of the leaf at the index, from the leaf up to the root."""
+    steps = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            steps.append({"sibling": level[sibling].hex(), "is_left": sibling < index})
+        index //= 2
+    return steps
+
+
+def build_distribution(rows):
+    """Builds the distribution of a list of (recipient, asset, amount) rows."""
+    if not rows:
+        raise ValueError("A distribution needs at least one leaf")
+
+    levels = build_tree([leaf_hash(index, *row) for index, row in enumerate(rows)])
+
+    caps = {}
+    for _, asset, amount in rows:
+        caps[asset] = caps.get(asset, 0) + amount
+
+    return {
+        "merkle_root": levels[-1][0].hex(),
+        "caps": [{"asset": asset, "amount": amount} for asset, amount in caps.items()],
+        "claims": [
+            {
+                "leaf": {"index": index, "recipient": recipient, "asset": asset, "amount": amount},
+                "proof": proof(levels, index),
+            }
+            for index, (recipient, asset, amount) in enumerate(rows)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Merkle tree and proofs of a CommunityFund distribution.")
+    parser.add_argument("csv", help="CSV file with the columns recipient, asset and amount")
+    args = parser.parse_args()
+
+    with open(args.csv, newline="") as f:
+        rows = [(row["recipient"].strip(), row["asset"].strip(), int(row["amount"])) for row in csv.DictReader(f)]
+
+    print(json.dumps(build_distribution(rows), indent=2))
+
+
+if __name__ == "__main__":
+    main()
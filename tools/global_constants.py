@@ -0,0 +1,160 @@
+"""Extracts large repeated Michelson sub-expressions into Tezos global constants.
+
+Every origination pays storage burn for the binary size of the script, and every call pays gas to deserialize and
+typecheck it. Large expressions repeated within or across the contracts (types of the storage fields, the
+getBalanceAt plumbing, record layouts shared by the DAO and its global lambdas...) are registered once as global
+constants and referenced with `constant "expr..."`. The node expands the references of a script before
+typechecking it, so the contracts behave exactly as before.
+
+The rewritten scripts are written to the output directory under the same names, along with constants.json, the list
+of constants to register in order-
+
+    [{"hash": "expr...", "value": <Micheline JSON>}, ...]
+
+The constants must be registered before the rewritten scripts are originated (see deploy/src/deploy.ts). Proposal
+lambdas are transaction parameters rather than scripts, and are not expanded, so they are not rewritten.
+
+Usage:
+
+    $ python tools/global_constants.py michelson/fa12_token.tz michelson/flow_dao.tz --out-dir michelson/constants
+
+A size report of the binary Micheline before and after the extraction is printed.
+"""
+
+import argparse
+import json
+import os
+
+import micheline
+
+# Expressions smaller than this are left inline
+MIN_SIZE = 128
+
+# Protocol limit on the binary size of a registered constant
+MAX_SIZE = 50_000
+
+# Binary size of a `constant "expr..."` reference
+REFERENCE_SIZE = len(micheline.encode({"prim": "constant", "args": [micheline.string("expr" + "1" * 50)]}))
+
+# Toplevel sections of a script
+SECTIONS = ("parameter", "storage", "code", "view")
+
+# Protocol storage cost, in mutez per byte
+COST_PER_BYTE = 250
+
+
+def _index(node, counts, nodes, toplevel=False):
+    # Encodes the node bottom-up, counting the occurrences of every candidate sub-expression on the way
+    if isinstance(node, list):
+        body = b"".join(_index(item, counts, nodes) for item in node)
+        encoded = b"\x02" + len(body).to_bytes(4, "big") + body
+    elif "prim" in node:
+        for arg in node.get("args", []):
+            _index(arg, counts, nodes)
+        encoded = micheline.encode(node)
+    else:
+        return micheline.encode(node)
+
+    # The toplevel sections (parameter, storage, code, view) stay in the script, and references are not nested
+    if not toplevel and not (isinstance(node, dict) and node["prim"] == "constant"):
+        if MIN_SIZE <= len(encoded) <= MAX_SIZE:
+            counts[encoded] = counts.get(encoded, 0) + 1
+            nodes[encoded] = node
+    return encoded
+
+
+def _replace(node, encoded, reference):
+    if isinstance(node, dict) and "prim" not in node:
+        return node
+    if micheline.encode(node) == encoded:
+        return reference
+    if isinstance(node, list):
+        return [_replace(item, encoded, reference) for item in node]
+    if "args" in node:
+        return dict(node, args=[_replace(arg, encoded, reference) for arg in node["args"]])
+    return node
+
+
+def _replace_args(section, encoded, reference):
+    # Replaces within a toplevel section, keeping the section itself
+    return dict(section, args=[_replace(arg, encoded, reference) for arg in section.get("args", [])])
+
+
+def saving(size, count):
+    """Bytes saved over all the scripts by registering an expression of the given size used count times."""
+    return count * (size - REFERENCE_SIZE) - size
+
+
+def extract(scripts):
+    """Extracts constants from a dict of name -> script. Returns the rewritten scripts and the constants."""
+    scripts = dict(scripts)
+    constants = []
+
+    while True:
+        counts, nodes = {}, {}
+        for script in scripts.values():
+            for section in script:
+                _index(section, counts, nodes, toplevel=True)
+
+        # Register the expression with the largest saving, then count again since it hides its sub-expressions
+        best = max(counts, key=lambda encoded: saving(len(encoded), counts[encoded]), default=None)
+        if best is None or saving(len(best), counts[best]) <= 0:
+            return scripts, constants
+
+        value = nodes[best]
+        constant_hash = micheline.expr_hash(value)
+        reference = {"prim": "constant", "args": [micheline.string(constant_hash)]}
+        constants.append({"hash": constant_hash, "value": value, "count": counts[best]})
+
+        for name, script in scripts.items():
+            scripts[name] = [_replace_args(section, best, reference) for section in script]
+
+
+def load(path):
+    """Parses a .tz script."""
+    with open(path) as f:
+        script = micheline.parse_script(f.read())
+    if not all(isinstance(section, dict) and section.get("prim") in SECTIONS for section in script):
+        raise ValueError("Not a Michelson script: " + path)
+    return script
+
+
+def size(node):
+    return len(micheline.encode(node))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract repeated Michelson into Tezos global constants.")
+    parser.add_argument("files", nargs="+", help="Michelson scripts (.tz)")
+    parser.add_argument("--out-dir", required=True, help="Directory of the rewritten files and constants.json")
+    parser.add_argument("--cost-per-byte", type=int, default=COST_PER_BYTE, help="Storage cost in mutez per byte")
+    args = parser.parse_args()
+
+    scripts = {os.path.basename(path): load(path) for path in args.files}
+    rewritten, constants = extract(scripts)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for name, script in rewritten.items():
+        with open(os.path.join(args.out_dir, name), "w") as f:
+            f.write(micheline.to_text(script, toplevel=True))
+    with open(os.path.join(args.out_dir, "constants.json"), "w") as f:
+        json.dump([{"hash": c["hash"], "value": c["value"]} for c in constants], f, indent=2)
+
+    rows = [(name, size(script), size(rewritten[name])) for name, script in scripts.items()]
+    rows.append(("total", sum(row[1] for row in rows), sum(row[2] for row in rows)))
+
+    print("%-24s %12s %12s %12s %14s" % ("file", "before (B)", "after (B)", "saved (B)", "saved (mutez)"))
+    for name, before, after in rows:
+        saved = before - after
+        print("%-24s %12d %12d %12d %14d" % (name, before, after, saved, saved * args.cost_per_byte))
+
+    # Registration is paid once, and later originations of the same contracts reuse the constants
+    registered = sum(size(constant["value"]) for constant in constants)
+    print("")
+    print("%d constants, %d B (%d mutez) to register" % (len(constants), registered, registered * args.cost_per_byte))
+    for constant in constants:
+        print("  %s %8d B, used %d times" % (constant["hash"], size(constant["value"]), constant["count"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""Minimal Micheline helpers used by the FlowDAO tools.
+
+Values are built as Micheline JSON-like Python objects ({"int": "1"}, {"prim": "Pair", "args": [...]}, ...)
+and encoded to the binary format used by the PACK instruction, so that off-chain tools produce exactly the
+bytes the contracts hash and verify. Michelson source (.tz files) can be parsed to the same objects and printed
+back.
+"""
+
+import hashlib
+import re
+import struct
+
+##########
+# Base58
+##########
+
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Base58 prefixes of the encoded Tezos values handled here
+PREFIXES = {
+    "tz1": bytes([6, 161, 159]),
+    "tz2": bytes([6, 161, 161]),
+    "tz3": bytes([6, 161, 164]),
+    "KT1": bytes([2, 90, 121]),
+    "edpk": bytes([13, 15, 37, 217]),
+    "sppk": bytes([3, 254, 226, 86]),
+    "p2pk": bytes([3, 178, 139, 127]),
+    "edsig": bytes([9, 245, 205, 134, 18]),
+    "spsig1": bytes([13, 115, 101, 19, 63]),
+    "p2sig": bytes([54, 240, 44, 52]),
+    "sig": bytes([4, 130, 43]),
+    "Net": bytes([87, 82, 0]),
+    "expr": bytes([13, 44, 64, 27]),
+}
+
+
+def b58decode(value):
+    """Decodes a base58 string, without a checksum."""
+    num = 0
+    for char in value:
+        num = num * 58 + B58_ALPHABET.index(char)
+    raw = num.to_bytes((num.bit_length() + 7) // 8, "big")
+    return b"\x00" * (len(value) - len(value.lstrip("1"))) + raw
+
+
+def b58decode_check(value):
+    """Decodes a base58check string and returns the payload including its prefix."""
+    raw = b58decode(value)
+    payload, checksum = raw[:-4], raw[-4:]
+    if hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        raise ValueError("Invalid base58 checksum: " + value)
+    return payload
+
+
+def b58encode(raw):
+    """Encodes raw bytes to a base58 string, without a checksum."""
+    num = int.from_bytes(raw, "big")
+    encoded = ""
+    while num > 0:
+        num, rem = divmod(num, 58)
+        encoded = B58_ALPHABET[rem] + encoded
+    return "1" * (len(raw) - len(raw.lstrip(b"\x00"))) + encoded
+
+
+def b58encode_check(payload):
+    """Encodes a payload (prefix included) to a base58check string."""
+    checksum = hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+    return b58encode(payload + checksum)
+
+
+def decode_prefixed(value, prefix):
+    """Decodes a base58check string and strips the expected prefix."""
+    payload = b58decode_check(value)
+    if not payload.startswith(PREFIXES[prefix]):
+        raise ValueError("Expected a " + prefix + " value: " + value)
+    return payload[len(PREFIXES[prefix]) :]
+
+
+#########################
+# Optimized data values
+#########################
+
+
+def nat(value):
+    return {"int": str(value)}
+
+
+def string(value):
+    return {"string": value}
+
+
+def raw_bytes(value):
+    return {"bytes": value.hex()}
+
+
+def pair(*values):
+    """Builds a right-combed pair, matching SmartPy's default record layouts."""
+    if len(values) == 1:
+        return values[0]
+    return {"prim": "Pair", "args": [values[0], pair(*values[1:])]}
+
+
+def address(value):
+    """Optimized (binary) form of an address, as produced by PACK."""
+    value = value.split("%")[0]
+    if value.startswith("KT1"):
+        return raw_bytes(b"\x01" + decode_prefixed(value, "KT1") + b"\x00")
+    tag = {"tz1": 0, "tz2": 1, "tz3": 2}[value[:3]]
+    return raw_bytes(bytes([0, tag]) + decode_prefixed(value, value[:3]))
+
+
+def address_from_bytes(raw):
+    """Inverse of address: returns the base58 form of a binary address."""
+    if raw[0] == 1:
+        return b58encode_check(PREFIXES["KT1"] + raw[1:21])
+    prefix = ("tz1", "tz2", "tz3")[raw[1]]
+    return b58encode_check(PREFIXES[prefix] + raw[2:22])
+
+
+def key(value):
+    """Optimized (binary) form of a public key."""
+    for tag, prefix in enumerate(("edpk", "sppk", "p2pk")):
+        if value.startswith(prefix):
+            return raw_bytes(bytes([tag]) + decode_prefixed(value, prefix))
+    raise ValueError("Unsupported public key: " + value)
+
+
+def chain_id(value):
+    """Optimized (binary) form of a chain id. Accepts a base58 (Net...) or hex (0x...) value."""
+    if value.startswith("0x"):
+        return raw_bytes(bytes.fromhex(value[2:]))
+    return raw_bytes(decode_prefixed(value, "Net"))
+
+
+##################
+# Binary encoding
+##################
+
+# Primitive codes, indexed by their protocol tag
+PRIMITIVES = [
+    # Keywords and data constructors
+    "parameter", "storage", "code", "False", "Elt", "Left", "None", "Pair", "Right", "Some", "True", "Unit",
+    # Instructions
+    "PACK", "UNPACK", "BLAKE2B", "SHA256", "SHA512", "ABS", "ADD", "AMOUNT", "AND", "BALANCE", "CAR", "CDR",
+    "CHECK_SIGNATURE", "COMPARE", "CONCAT", "CONS", "CREATE_ACCOUNT", "CREATE_CONTRACT", "IMPLICIT_ACCOUNT", "DIP",
+    "DROP", "DUP", "EDIV", "EMPTY_MAP", "EMPTY_SET", "EQ", "EXEC", "FAILWITH", "GE", "GET", "GT", "HASH_KEY", "IF",
+    "IF_CONS", "IF_LEFT", "IF_NONE", "INT", "LAMBDA", "LE", "LEFT", "LOOP", "LSL", "LSR", "LT", "MAP", "MEM", "MUL",
+    "NEG", "NEQ", "NIL", "NONE", "NOT", "NOW", "OR", "PAIR", "PUSH", "RIGHT", "SIZE", "SOME", "SOURCE", "SENDER",
+    "SELF", "STEPS_TO_QUOTA", "SUB", "SWAP", "TRANSFER_TOKENS", "SET_DELEGATE", "UNIT", "UPDATE", "XOR", "ITER",
+    "LOOP_LEFT", "ADDRESS", "CONTRACT", "ISNAT", "CAST", "RENAME",
+    # Types
+    "bool", "contract", "int", "key", "key_hash", "lambda", "list", "map", "big_map", "nat", "option", "or", "pair",
+    "set", "signature", "string", "bytes", "mutez", "timestamp", "unit", "operation", "address",
+    # Later protocol additions, in the order of their tags
+    "SLICE", "DIG", "DUG", "EMPTY_BIG_MAP", "APPLY", "chain_id", "CHAIN_ID", "LEVEL", "SELF_ADDRESS", "never",
+    "NEVER", "UNPAIR", "VOTING_POWER", "TOTAL_VOTING_POWER", "KECCAK", "SHA3", "PAIRING_CHECK", "bls12_381_g1",
+    "bls12_381_g2", "bls12_381_fr", "sapling_state", "sapling_transaction_deprecated", "SAPLING_EMPTY_STATE",
+    "SAPLING_VERIFY_UPDATE", "ticket", "TICKET_DEPRECATED", "READ_TICKET", "SPLIT_TICKET", "JOIN_TICKETS",
+    "GET_AND_UPDATE", "chest", "chest_key", "OPEN_CHEST", "VIEW", "view", "constant", "SUB_MUTEZ",
+    "tx_rollup_l2_address", "MIN_BLOCK_TIME", "sapling_transaction", "EMIT", "Lambda_rec", "LAMBDA_REC", "TICKET",
+    "BYTES", "NAT",
+]  # fmt: skip
+
+
+def encode_zarith(value):
+    sign = 0x40 if value < 0 else 0
+    value = abs(value)
+    out = bytearray([sign | (value & 0x3F)])
+    value >>= 6
+    while value:
+        out[-1] |= 0x80
+        out.append(value & 0x7F)
+        value >>= 7
+    return bytes(out)
+
+
+def encode(node):
+    """Encodes a Micheline node to its binary form."""
+    if isinstance(node, list):
+        body = b"".join(encode(item) for item in node)
+        return b"\x02" + struct.pack(">I", len(body)) + body
+    if "int" in node:
+        return b"\x00" + encode_zarith(int(node["int"]))
+    if "string" in node:
+        body = node["string"].encode("utf-8")
+        return b"\x01" + struct.pack(">I", len(body)) + body
+    if "bytes" in node:
+        body = bytes.fromhex(node["bytes"])
+        return b"\x0a" + struct.pack(">I", len(body)) + body
+
+    code = bytes([PRIMITIVES.index(node["prim"])])
+    args = node.get("args", [])
+    annots = " ".join(node.get("annots", [])).encode("utf-8")
+    annots_field = struct.pack(">I", len(annots)) + annots if annots else b""
+    if len(args) <= 2:
+        tag = 3 + 2 * len(args) + (1 if annots else 0)
+        return bytes([tag]) + code + b"".join(encode(arg) for arg in args) + annots_field
+    body = b"".join(encode(arg) for arg in args)
+    return b"\x09" + code + struct.pack(">I", len(body)) + body + struct.pack(">I", len(annots)) + annots
+
+
+def pack(node):
+    """Returns the bytes produced by the PACK instruction for an optimized data value."""
+    return b"\x05" + encode(node)
+
+
+def blake2b(data):
+    return hashlib.blake2b(data, digest_size=32).digest()
+
+
+def expr_hash(node):
+    """Returns the expr... hash under which a global constant of the given value is registered."""
+    return b58encode_check(PREFIXES["expr"] + blake2b(encode(node)))
+
+
+####################
+# Michelson source
+####################
+
+TOKENS = re.compile(
+    r"""
+    (?P<space>\s+|\#[^\n]*|/\*.*?\*/)
+    | (?P<string>"(?:[^"\\]|\\.)*")
+    | (?P<bytes>0x[0-9a-fA-F]*)
+    | (?P<int>-?[0-9]+)
+    | (?P<annot>[%@:][_0-9a-zA-Z.%@]*)
+    | (?P<prim>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<punct>[{}();])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+ESCAPES = {"n": "\n", "t": "\t", "b": "\b", "r": "\r", "\\": "\\", '"': '"'}
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = TOKENS.match(text, pos)
+        if match is None:
+            raise ValueError("Unexpected character at offset %d: %r" % (pos, text[pos : pos + 20]))
+        if match.lastgroup != "space":
+            tokens.append((match.lastgroup, match.group()))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, value):
+        kind, token = self.next()
+        if token != value:
+            raise ValueError("Expected %r, got %r" % (value, token))
+
+    def literal(self, kind, token):
+        if kind == "int":
+            return {"int": str(int(token))}
+        if kind == "bytes":
+            return {"bytes": token[2:].lower()}
+        return {"string": re.sub(r"\\(.)", lambda m: ESCAPES[m.group(1)], token[1:-1])}
+
+    def sequence(self, end):
+        # Items separated (and optionally terminated) by ';', up to the closing token
+        items = []
+        while self.peek()[1] != end:
+            items.append(self.application())
+            if self.peek()[1] == ";":
+                self.next()
+            elif self.peek()[1] != end:
+                raise ValueError("Expected ';' or %r, got %r" % (end, self.peek()[1]))
+        return items
+
+    def application(self):
+        # A primitive with its annotations and arguments, or a single argument
+        kind, token = self.peek()
+        if kind != "prim":
+            return self.argument()
+        self.next()
+        node = {"prim": token}
+        annots, args = [], []
+        while True:
+            kind, token = self.peek()
+            if kind == "annot":
+                annots.append(self.next()[1])
+            elif kind in ("int", "string", "bytes", "prim") or token in ("(", "{"):
+                args.append(self.argument())
+            else:
+                break
+        if args:
+            node["args"] = args
+        if annots:
+            node["annots"] = annots
+        return node
+
+    def argument(self):
+        kind, token = self.next()
+        if kind in ("int", "string", "bytes"):
+            return self.literal(kind, token)
+        if kind == "prim":
+            return {"prim": token}
+        if token == "(":
+            node = self.application()
+            self.expect(")")
+            return node
+        if token == "{":
+            items = self.sequence("}")
+            self.expect("}")
+            return items
+        raise ValueError("Unexpected token %r" % token)
+
+
+def parse(text):
+    """Parses a Michelson expression, such as a lambda or a value."""
+    parser = _Parser(text)
+    node = parser.application()
+    if parser.peek()[0] is not None:
+        raise ValueError("Unexpected token %r" % parser.peek()[1])
+    return node
+
+
+def parse_script(text):
+    """Parses a Michelson script (a .tz file) to the list of its toplevel sections."""
+    parser = _Parser(text)
+    return parser.sequence(None)
+
+
+def to_text(node, toplevel=False):
+    """Prints a Micheline node as Michelson. A script (a list of toplevel sections) is printed with toplevel=True."""
+    if toplevel:
+        return "".join(to_text(section) + ";\n" for section in node)
+    if isinstance(node, list):
+        return "{" + "; ".join(to_text(item) for item in node) + "}"
+    if "int" in node:
+        return node["int"]
+    if "bytes" in node:
+        return "0x" + node["bytes"]
+    if "string" in node:
+        return '"' + node["string"].replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+    parts = [node["prim"]] + node.get("annots", [])
+    for arg in node.get("args", []):
+        nested = isinstance(arg, dict) and "prim" in arg and ("args" in arg or "annots" in arg)
+        parts.append("(" + to_text(arg) + ")" if nested else to_text(arg))
+    return " ".join(parts)
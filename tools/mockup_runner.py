@@ -0,0 +1,159 @@
+"""Replays a trace of tools/workload.py on the token and the DAO in the mockup mode of octez-client.
+
+The gas and the storage burn of each operation are read from the receipts, and summed per kind of operation. The
+token and the DAO are originated beforehand in the mockup (see compile.sh and the deploy folder), with the runner's
+admin account as the administrator of the token.
+
+The holders of a trace have no known keys, so each of them is mapped to a key generated in the mockup and funded by
+the admin account. Their tz1 addresses are replaced by the addresses of these keys in the arguments of the calls.
+
+The mockup is created with --asynchronous, so that a block is baked for every level of the trace. Levels without
+operations are skipped, so the DAO should be originated with a voting_period matching the time between the baked
+blocks rather than the one of the trace.
+
+With --hub, the calls of the token and of the DAO all go to a governance hub, which has the entrypoints of both.
+Replaying a trace on both setups compares their gas per kind of operation (see docs/governance_hub.md).
+
+Usage:
+
+    $ octez-client --mode mockup --base-dir /tmp/mockup create mockup --asynchronous
+    $ python tools/mockup_runner.py trace.jsonl --token KT1... --dao KT1... --base-dir /tmp/mockup [--dry-run]
+    $ python tools/mockup_runner.py trace.jsonl --hub KT1... --base-dir /tmp/mockup [--dry-run]
+"""
+
+import argparse
+import json
+import re
+import subprocess
+
+CONSUMED_GAS = re.compile(r"Consumed gas: ([\d.]+)")
+STORAGE_DIFF = re.compile(r"Paid storage size diff: (\d+) bytes")
+ADDRESS = re.compile(r"Hash: (tz1\w+)")
+
+# An empty proposal lambda
+EMPTY_LAMBDA = "{ DROP ; NIL operation }"
+
+
+class Client:
+    """octez-client in mockup mode. With dry_run, the commands are printed instead of being run."""
+
+    def __init__(self, binary, base_dir, dry_run=False):
+        self.command = [binary, "--mode", "mockup", "--base-dir", base_dir]
+        self.dry_run = dry_run
+
+    def run(self, *args):
+        if self.dry_run:
+            print(" ".join(self.command + list(args)))
+            return ""
+        result = subprocess.run(self.command + list(args), capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+        return result.stdout
+
+    def call(self, source, contract, entrypoint, arg):
+        return self.run(
+            "transfer", "0", "from", source, "to", contract, "--entrypoint", entrypoint, "--arg", arg, "--burn-cap", "1"
+        )
+
+    def bake(self, baker):
+        self.run("bake", "for", baker, "--minimal-timestamp")
+
+
+class Runner:
+    def __init__(self, client, token, dao, admin):
+        self.client = client
+        self.token = token
+        self.dao = dao
+        self.admin = admin
+
+        # Trace address -> (alias, mockup address)
+        self.accounts = {}
+
+        # Kind -> [count, gas, storage bytes, failures]
+        self.totals = {}
+
+    def account(self, address):
+        if address not in self.accounts:
+            alias = "holder-%d" % len(self.accounts)
+            self.client.run("gen", "keys", alias, "--force")
+            self.client.run("transfer", "1", "from", self.admin, "to", alias, "--burn-cap", "1")
+            match = ADDRESS.search(self.client.run("show", "address", alias))
+            self.accounts[address] = (alias, match.group(1) if match else address)
+        return self.accounts[address]
+
+    def arguments(self, operation):
+        """Source, contract, entrypoint and Michelson argument of an operation."""
+        kind = operation["kind"]
+        if kind == "mint":
+            _, to_ = self.account(operation["to"])
+            return self.admin, self.token, "mint", 'Pair "%s" %d' % (to_, operation["amount"])
+        if kind == "transfer":
+            source, from_ = self.account(operation["from"])
+            _, to_ = self.account(operation["to"])
+            return source, self.token, "transfer", 'Pair "%s" (Pair "%s" %d)' % (from_, to_, operation["amount"])
+        if kind == "propose":
+            source, _ = self.account(operation["creator"])
+            return source, self.dao, "register_proposal", "Pair 0 (Pair 0x1220aa %s)" % EMPTY_LAMBDA
+        if kind == "vote":
+            source, _ = self.account(operation["voter"])
+            return source, self.dao, "vote", "Pair %d %d" % (operation["proposal"], operation["vote_value"])
+        if kind == "end_voting":
+            return self.admin, self.dao, "end_voting", str(operation["proposal"])
+        raise ValueError("Unsupported operation: " + kind)
+
+    def apply(self, operation):
+        totals = self.totals.setdefault(operation["kind"], [0, 0.0, 0, 0])
+        totals[0] += 1
+        try:
+            receipt = self.client.call(*self.arguments(operation))
+        except RuntimeError:
+            totals[3] += 1
+            return
+        totals[1] += sum(float(gas) for gas in CONSUMED_GAS.findall(receipt))
+        totals[2] += sum(int(size) for size in STORAGE_DIFF.findall(receipt))
+
+    def replay(self, operations):
+        level = None
+        for operation in operations:
+            # A block per level of the trace
+            if level is not None and operation["level"] != level:
+                self.client.bake(self.admin)
+            level = operation["level"]
+            self.apply(operation)
+        self.client.bake(self.admin)
+
+    def report(self):
+        print("%-12s %10s %10s %14s %14s" % ("kind", "count", "failed", "gas / op", "storage (B)"))
+        for kind, (count, gas, storage, failures) in sorted(self.totals.items()):
+            succeeded = max(1, count - failures)
+            print("%-12s %10d %10d %14.1f %14d" % (kind, count, failures, gas / succeeded, storage))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a workload trace in the mockup mode of octez-client.")
+    parser.add_argument("trace", help="JSONL trace of tools/workload.py")
+    parser.add_argument("--token", help="Address or alias of the token")
+    parser.add_argument("--dao", help="Address or alias of the DAO")
+    parser.add_argument("--hub", help="Address or alias of a governance hub, instead of the token and the DAO")
+    parser.add_argument("--admin", default="bootstrap1", help="Administrator of the token, funding the holders")
+    parser.add_argument("--base-dir", required=True, help="Base directory of the mockup")
+    parser.add_argument("--client", default="octez-client", help="Path to octez-client")
+    parser.add_argument("--dry-run", action="store_true", help="Print the commands instead of running them")
+    args = parser.parse_args()
+
+    if args.hub:
+        args.token = args.dao = args.hub
+    elif not (args.token and args.dao):
+        parser.error("--token and --dao, or --hub, are required")
+
+    with open(args.trace) as f:
+        operations = [json.loads(line) for line in f if line.strip()]
+
+    runner = Runner(Client(args.client, args.base_dir, args.dry_run), args.token, args.dao, args.admin)
+    runner.replay(operations)
+    if not args.dry_run:
+        runner.report()
+
+
+if __name__ == "__main__":
+    main()
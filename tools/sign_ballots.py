@@ -0,0 +1,69 @@
+"""Builds and signs FlowDAO ballots for the submit_ballots entrypoint.
+
+The input is a JSON list of ballots:
+
+    [{"secret_key": "edsk...", "proposal_id": 1, "vote_value": 0}, ...]
+
+The output is a JSON list of signed ballots, each carrying the voter's public key and a signature over the packed
+BALLOT_PAYLOAD_TYPE value (see types/ballot.py). A relayer passes the list as-is to submit_ballots.
+
+Usage:
+
+    $ python tools/sign_ballots.py --dao KT1... --chain-id NetXdQprcVkpaWU ballots.json > signed.json
+
+Signing requires pytezos (pip install pytezos).
+"""
+
+import argparse
+import json
+import sys
+
+import micheline
+
+
+def ballot_payload(dao, chain_id, proposal_id, vote_value):
+    """Packs the value a voter signs, following the layout of BALLOT_PAYLOAD_TYPE."""
+    return micheline.pack(
+        micheline.pair(
+            micheline.address(dao),
+            micheline.chain_id(chain_id),
+            micheline.nat(proposal_id),
+            micheline.nat(vote_value),
+        )
+    )
+
+
+def sign_ballot(dao, chain_id, ballot):
+    try:
+        from pytezos import Key
+    except ImportError:
+        sys.exit("Fatal: pytezos is required to sign ballots (pip install pytezos)")
+
+    signer = Key.from_encoded_key(ballot["secret_key"])
+    payload = ballot_payload(dao, chain_id, ballot["proposal_id"], ballot["vote_value"])
+
+    return {
+        "public_key": signer.public_key(),
+        "signature": signer.sign(payload),
+        "proposal_id": ballot["proposal_id"],
+        "vote_value": ballot["vote_value"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and sign FlowDAO ballots.")
+    parser.add_argument("ballots", help="JSON file with the ballots to sign")
+    parser.add_argument("--dao", required=True, help="Address of the FlowDAO contract")
+    parser.add_argument("--chain-id", required=True, help="Chain id of the network (Net... or 0x...)")
+    args = parser.parse_args()
+
+    with open(args.ballots) as f:
+        ballots = json.load(f)
+
+    signed = [sign_ballot(args.dao, args.chain_id, ballot) for ballot in ballots]
+    json.dump(signed, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""Pure-Python model of the KFL snapshot ledger and of FlowDAO voting, for capacity planning.
+
+SmartPy scenarios are too slow to replay a year of transfers or a proposal with tens of thousands of voters. This
+model follows FA12_snapshot (balances, snapshots, numSnapshots, totalSupplySnapshots and getBalanceAt) and the
+proposal, vote and end_voting logic of FlowDAO, and reports-
+
+- the growth of the snapshot big_maps,
+- the number of snapshots read by each getBalanceAt lookup (probes), replaying the binary search of the contract,
+- estimates of the storage burn and of the gas spent on snapshot big_map accesses.
+
+The history of an address is kept as an array of levels and a list of balances, so lookups are a bisection and
+balances_at answers a whole batch of addresses in one call. The model is checked against the SmartPy contracts
+with the vectors of helpers/snapshot_vectors.json, which the tests of fa12_token.py and flow_dao.py replay as well.
+
+A trace is a JSONL file with one operation per line, in the format of tools/snapshot_tree.py, extended with the
+operations of the DAO-
+
+    {"level": 1, "kind": "mint", "to": "tz1...", "amount": 100}
+    {"level": 2, "kind": "transfer", "from": "tz1...", "to": "tz1...", "amount": 40}
+    {"level": 3, "kind": "propose", "creator": "tz1..."}
+    {"level": 4, "kind": "vote", "voter": "tz1...", "proposal": 1, "vote_value": 0}
+    {"level": 9, "kind": "end_voting", "proposal": 1}
+
+Usage:
+
+    $ python tools/simulator.py trace.jsonl [--quorum-votes 200000] [--proposal-threshold 50000] [--voting-period 300]
+    $ python tools/simulator.py --vectors helpers/snapshot_vectors.json
+"""
+
+import argparse
+import array
+import bisect
+import json
+import math
+import os
+
+import micheline
+
+# Protocol storage cost, in mutez per byte
+COST_PER_BYTE = 250
+
+# Fixed key overhead of a new big_map entry, in bytes
+ENTRY_OVERHEAD = 65
+
+# Rough gas of a big_map access by the contract. To be calibrated against simulated calls (e.g in mockup mode).
+GAS_PER_ACCESS = 100
+
+# Address used for the encoded sizes of the big_map keys. All implicit accounts have the same encoded size.
+SAMPLE_ADDRESS = "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb"
+
+# Proposal status, as in types/proposal.py
+PROPOSAL_STATUS_VOTING = 0
+PROPOSAL_STATUS_TIMELOCKED = 1
+PROPOSAL_STATUS_REJECTED = 3
+
+# Vote values, as in types/proposal.py
+VOTE_VALUE_UPVOTE = 0
+VOTE_VALUE_DOWNVOTE = 1
+
+# Seconds per level, as in tools/workload.py and helpers/trace.py
+BLOCK_TIME = 15
+
+DAY = 86400  # Seconds in a day
+
+
+class ContractError(Exception):
+    """A failed operation, carrying the error message of the contract."""
+
+
+def _size(node):
+    return len(micheline.encode(node))
+
+
+def snapshot_entry_size(index, level, balance):
+    """Bytes of a new entry of the snapshots big_map."""
+    key = micheline.pair(micheline.address(SAMPLE_ADDRESS), micheline.nat(index))
+    value = micheline.pair(micheline.nat(level), micheline.nat(balance))
+    return ENTRY_OVERHEAD + _size(key) + _size(value)
+
+
+class History:
+    """Snapshots of a single balance, starting with the base snapshot at level 0."""
+
+    __slots__ = ("levels", "values")
+
+    def __init__(self):
+        self.levels = array.array("Q", [0])
+        self.values = [0]
+
+    def __len__(self):
+        return len(self.levels)
+
+    def record(self, level, value):
+        """Takes a snapshot, as takeSnapshot. Returns True if a new snapshot was appended."""
+        if self.levels[-1] == level:
+            self.values[-1] = value
+            return False
+        self.levels.append(level)
+        self.values.append(value)
+        return True
+
+    def at(self, level):
+        return self.values[bisect.bisect_right(self.levels, level) - 1]
+
+    def search(self, level):
+        """Replays searchSnapshots of the contract. Returns the index found and the number of snapshots read."""
+        levels = self.levels
+        probes = 1
+        index = len(levels) - 1
+
+        if level < levels[index]:
+            low, high, mid = 0, len(levels) - 2, 0
+            while True:
+                probes += 1
+                if not (low < high and levels[mid] != level):
+                    break
+                mid = (low + high + 1) // 2
+                probes += 2
+                if levels[mid] > level:
+                    high = mid - 1
+                if levels[mid] < level:
+                    low = mid
+            probes += 1
+            index = mid if levels[mid] == level else low
+
+        return index, probes
+
+
+class SnapshotLedger:
+    """Model of the FA12_snapshot ledger."""
+
+    def __init__(self):
+        self.balances = {}
+        self.histories = {}
+        self.total_supply = 0
+        self.supply_history = History()
+
+        # Statistics
+        self.snapshots = 1
+        self.storage_bytes = 0
+        self.accesses = 0
+        self.lookups = 0
+        self.probes = 0
+        self.max_probes = 0
+
+    def _snapshot(self, address, level):
+        history = self.histories.get(address)
+        self.accesses += 3
+        if history is None:
+            history = self.histories[address] = History()
+            self.snapshots += 1
+            self.storage_bytes += snapshot_entry_size(0, 0, 0)
+        if history.record(level, self.balances[address]):
+            self.snapshots += 1
+            self.storage_bytes += snapshot_entry_size(len(history) - 1, level, self.balances[address])
+        self.accesses += 2
+
+    def mint(self, address, amount, level):
+        self.balances[address] = self.balances.get(address, 0) + amount
+        self._snapshot(address, level)
+
+        self.total_supply += amount
+        self.accesses += 2
+        if self.supply_history.record(level, self.total_supply):
+            self.snapshots += 1
+            self.storage_bytes += snapshot_entry_size(len(self.supply_history) - 1, level, self.total_supply)
+
+    def transfer(self, from_, to_, amount, level):
+        if from_ == to_:
+            raise ContractError("FA1.2_SelfTransferNotAllowed")
+        if self.balances.get(from_, 0) < amount:
+            raise ContractError("FA1.2_InsufficientBalance")
+
+        self.balances[from_] -= amount
+        self.balances[to_] = self.balances.get(to_, 0) + amount
+        self._snapshot(from_, level)
+        self._snapshot(to_, level)
+
+    def balance_at(self, address, level, current_level):
+        """getBalanceAt, as called at current_level."""
+        if level >= current_level:
+            raise ContractError("FA1.2_BlockNotFinalized")
+
+        self.lookups += 1
+        self.accesses += 1
+        history = self.histories.get(address)
+        if history is None:
+            return 0
+
+        index, probes = history.search(level)
+        self.probes += probes
+        self.accesses += probes + 1
+        self.max_probes = max(self.max_probes, probes)
+        return history.values[index]
+
+    def balances_at(self, addresses, level):
+        """Balances of a batch of addresses at a level, without the statistics of the contract lookups."""
+        histories = self.histories
+        return [histories[address].at(level) if address in histories else 0 for address in addresses]
+
+    def total_supply_at(self, level, current_level):
+        if level >= current_level:
+            raise ContractError("FA1.2_BlockNotFinalized")
+        return self.supply_history.at(level)
+
+
+class DAOModel:
+    """Model of the proposal, vote and end_voting logic of FlowDAO, for the root space. Each level is block_time
+    seconds after the previous one, and the voting period is a whole number of levels."""
+
+    def __init__(self, ledger, quorum_votes, proposal_threshold, voting_period=2 * DAY, block_time=BLOCK_TIME):
+        self.ledger = ledger
+        self.quorum_votes = quorum_votes
+        self.proposal_threshold = proposal_threshold
+        self.voting_levels = voting_period // block_time
+        self.proposals = {}
+        self.voters = set()
+        self.uuid = 0
+
+    def propose(self, creator, level):
+        # Balance snapshot of the previous level
+        if self.ledger.balance_at(creator, level - 1, level) < self.proposal_threshold:
+            raise ContractError("NOT_ENOUGH_TOKENS")
+
+        self.uuid += 1
+        self.proposals[self.uuid] = {
+            "up_votes": 0,
+            "down_votes": 0,
+            "origin_level": level,
+            "voting_end": level + self.voting_levels,
+            "status": PROPOSAL_STATUS_VOTING,
+        }
+        return self.uuid
+
+    def vote(self, voter, proposal_id, vote_value, level):
+        proposal = self.proposals.get(proposal_id)
+        if proposal is None:
+            raise ContractError("INVALID_PROPOSAL_ID")
+        if proposal["status"] != PROPOSAL_STATUS_VOTING or level >= proposal["voting_end"]:
+            raise ContractError("VOTING_ALREADY_ENDED")
+        if (voter, proposal_id) in self.voters:
+            raise ContractError("ALREADY_VOTED")
+
+        # Balance snapshot of the level before proposal origin
+        votes = self.ledger.balance_at(voter, proposal["origin_level"] - 1, level)
+        if votes == 0:
+            raise ContractError("INVALID_VOTE")
+
+        if vote_value == VOTE_VALUE_UPVOTE:
+            proposal["up_votes"] += votes
+        elif vote_value == VOTE_VALUE_DOWNVOTE:
+            proposal["down_votes"] += votes
+        else:
+            raise ContractError("INVALID_VOTE_VALUE")
+        self.voters.add((voter, proposal_id))
+
+    def end_voting(self, proposal_id, level):
+        proposal = self.proposals.get(proposal_id)
+        if proposal is None:
+            raise ContractError("INVALID_PROPOSAL_ID")
+        if proposal["status"] != PROPOSAL_STATUS_VOTING:
+            raise ContractError("VOTING_ALREADY_ENDED")
+
+        quorum_attained = proposal["up_votes"] + proposal["down_votes"] >= self.quorum_votes
+
+        # Voting can end early only if the remaining voting power cannot change the outcome
+        if level <= proposal["voting_end"]:
+            total_supply = self.ledger.total_supply_at(proposal["origin_level"] - 1, level)
+            passing = proposal["up_votes"] * 2 > total_supply and quorum_attained
+            failing = proposal["down_votes"] * 2 >= total_supply
+            if not (passing or failing):
+                raise ContractError("VOTING_ONGOING")
+
+        passed = proposal["up_votes"] > proposal["down_votes"] and quorum_attained
+        proposal["status"] = PROPOSAL_STATUS_TIMELOCKED if passed else PROPOSAL_STATUS_REJECTED
+
+
+def apply(operation, ledger, dao):
+    """Applies an operation of a trace. Raises ContractError if it fails."""
+    kind, level = operation["kind"], operation["level"]
+    if kind == "mint":
+        ledger.mint(operation["to"], operation["amount"], level)
+    elif kind == "transfer":
+        ledger.transfer(operation["from"], operation["to"], operation["amount"], level)
+    elif kind == "propose":
+        dao.propose(operation["creator"], level)
+    elif kind == "vote":
+        dao.vote(operation["voter"], operation["proposal"], operation["vote_value"], level)
+    elif kind == "end_voting":
+        dao.end_voting(operation["proposal"], level)
+    else:
+        raise ValueError("Unsupported operation: " + kind)
+
+
+def simulate(operations, quorum_votes, proposal_threshold, voting_period, block_time, checkpoints=10):
+    """Replays a trace. Returns the ledger, the DAO, the errors per message and the growth of the snapshots."""
+    ledger = SnapshotLedger()
+    dao = DAOModel(ledger, quorum_votes, proposal_threshold, voting_period, block_time)
+    errors = {}
+    growth = []
+
+    step = max(1, len(operations) // checkpoints)
+    for count, operation in enumerate(operations, 1):
+        try:
+            apply(operation, ledger, dao)
+        except ContractError as error:
+            errors[str(error)] = errors.get(str(error), 0) + 1
+        if count % step == 0 or count == len(operations):
+            growth.append((count, operation["level"], ledger.snapshots, ledger.storage_bytes))
+
+    return ledger, dao, errors, growth
+
+
+def check_vectors(path):
+    """Checks the model against the shared test vectors. Returns the list of mismatches."""
+    with open(path) as f:
+        vectors = json.load(f)
+    mismatches = []
+
+    vector = vectors["ledger"]
+    ledger = SnapshotLedger()
+    for operation in vector["operations"]:
+        apply(operation, ledger, None)
+    for query in vector["balances"]:
+        balance = ledger.balance_at(query["address"], query["level"], vector["level"])
+        if balance != query["balance"]:
+            mismatches.append("balance of %(address)s at level %(level)d" % query)
+
+    vector = vectors["dao"]
+    ledger = SnapshotLedger()
+    dao = DAOModel(ledger, **vector["governance_parameters"])
+    for operation in vector["operations"]:
+        try:
+            apply(operation, ledger, dao)
+            error = None
+        except ContractError as e:
+            error = str(e)
+        if error != operation.get("error"):
+            mismatches.append("%s at level %d failed with %s" % (operation["kind"], operation["level"], error))
+    for expected in vector["proposals"]:
+        proposal = dao.proposals.get(expected["id"], {})
+        if any(proposal.get(field) != expected[field] for field in ("up_votes", "down_votes", "status")):
+            mismatches.append("proposal %d" % expected["id"])
+
+    return mismatches
+
+
+def report(ledger, dao, errors, growth, operations, cost_per_byte, gas_per_access):
+    print("%d operations, %d failed" % (operations, sum(errors.values())))
+    for message, count in sorted(errors.items()):
+        print("  %-32s %d" % (message, count))
+
+    lengths = [len(history) for history in ledger.histories.values()] or [0]
+    print("")
+    print("%d holders, %d snapshots" % (len(ledger.histories), ledger.snapshots))
+    print("  snapshots per holder: mean %.1f, max %d" % (sum(lengths) / len(lengths), max(lengths)))
+    print("  storage: %d B (%d mutez)" % (ledger.storage_bytes, ledger.storage_bytes * cost_per_byte))
+
+    print("")
+    print("%-12s %10s %12s %14s" % ("operations", "level", "snapshots", "storage (B)"))
+    for count, level, snapshots, storage_bytes in growth:
+        print("%-12d %10d %12d %14d" % (count, level, snapshots, storage_bytes))
+
+    if ledger.lookups:
+        print("")
+        print("%d getBalanceAt lookups" % ledger.lookups)
+        print("  probes: mean %.1f, max %d" % (ledger.probes / ledger.lookups, ledger.max_probes))
+        print("  log2 of the longest history: %.1f" % math.log2(max(lengths)))
+
+    print("")
+    print("%d snapshot big_map accesses, ~%d gas" % (ledger.accesses, ledger.accesses * gas_per_access))
+
+    if dao.proposals:
+        print("")
+        print("%-8s %24s %24s %8s" % ("proposal", "up_votes", "down_votes", "status"))
+        for proposal_id, proposal in sorted(dao.proposals.items()):
+            print(
+                "%-8d %24d %24d %8d"
+                % (proposal_id, proposal["up_votes"], proposal["down_votes"], proposal["status"])
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the KFL snapshot ledger and FlowDAO voting.")
+    parser.add_argument("trace", nargs="?", help="JSONL file with the operations to replay")
+    parser.add_argument("--vectors", help="Check the model against the test vectors of this file instead")
+    parser.add_argument("--quorum-votes", type=int, default=200_000, help="Quorum of the root space")
+    parser.add_argument("--proposal-threshold", type=int, default=50_000, help="Proposal threshold of the root space")
+    parser.add_argument("--voting-period", type=int, default=2 * DAY, help="Voting period of the root space (seconds)")
+    parser.add_argument("--block-time", type=int, default=BLOCK_TIME, help="Seconds per level")
+    parser.add_argument("--cost-per-byte", type=int, default=COST_PER_BYTE, help="Storage cost in mutez per byte")
+    parser.add_argument("--gas-per-access", type=int, default=GAS_PER_ACCESS, help="Gas of a big_map access")
+    args = parser.parse_args()
+
+    if args.vectors:
+        mismatches = check_vectors(args.vectors)
+        for mismatch in mismatches:
+            print("Mismatch: " + mismatch)
+        print("%s: %s" % (os.path.basename(args.vectors), "FAILED" if mismatches else "OK"))
+        raise SystemExit(1 if mismatches else 0)
+
+    if not args.trace:
+        parser.error("a trace or --vectors is required")
+
+    with open(args.trace) as f:
+        operations = [json.loads(line) for line in f if line.strip()]
+
+    ledger, dao, errors, growth = simulate(
+        operations, args.quorum_votes, args.proposal_threshold, args.voting_period, args.block_time
+    )
+    report(ledger, dao, errors, growth, len(operations), args.cost_per_byte, args.gas_per_access)
+
+
+if __name__ == "__main__":
+    main()
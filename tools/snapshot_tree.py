@@ -0,0 +1,169 @@
+"""Builds the balance Merkle-sum tree of a FlowDAO proposal in snapshot mode.
+
+The snapshot service posts the root of the tree of all balances at the checkpoint of a proposal (post_snapshot),
+and voters prove their balance with the proof of their leaf (vote_with_proof). The checkpoint is the last level
+before the epoch of the lite token in which the proposal was registered i.e
+(origin_level // epoch_length) * epoch_length - 1.
+
+Leaves are the packed SNAPSHOT_LEAF_TYPE values of the holders with a balance, sorted by address in the order of
+Michelson (their binary form), at the same depth. A node carries the sum of the balances below it, and a parent
+node hashes the packed SNAPSHOT_PARENT_TYPE value of its children and its total (see types/snapshot.py). The
+positions after the last leaf are padded with empty nodes (0x, 0), so that a node covering no leaf is empty.
+
+Balances are read from a node. LocalNode is a stand-in that replays the token operations of a JSONL file, one
+operation per line-
+
+    {"level": 1, "kind": "mint", "to": "tz1...", "amount": 100}
+    {"level": 2, "kind": "transfer", "from": "tz1...", "to": "tz1...", "amount": 40}
+
+The output is a JSON object with the parameters of post_snapshot, and the balance, index and proof of every holder-
+
+    {"level": 41, "root": "...", "total_supply": 100, "depth": 1, "size": 2,
+     "holders": {"tz1...": {"balance": 60, "index": 0, "proof": [...]}}}
+
+Usage:
+
+    $ python tools/snapshot_tree.py operations.jsonl --level 41 > snapshot.json
+"""
+
+import argparse
+import json
+
+import micheline
+
+
+class LocalNode:
+    """Stand-in for a node running the lite token, replaying its operations in memory."""
+
+    def __init__(self, operations):
+        self.operations = sorted(operations, key=lambda operation: operation["level"])
+
+    @classmethod
+    def from_jsonl(cls, path):
+        with open(path) as f:
+            return cls([json.loads(line) for line in f if line.strip()])
+
+    def balances_at(self, level):
+        """Balances of the holders at the end of the level."""
+        balances = {}
+        for operation in self.operations:
+            if operation["level"] > level:
+                break
+            amount = operation["amount"]
+            if operation["kind"] == "transfer":
+                if balances.get(operation["from"], 0) < amount:
+                    raise ValueError("Insufficient balance: %s at level %d" % (operation["from"], operation["level"]))
+                balances[operation["from"]] -= amount
+            elif operation["kind"] != "mint":
+                raise ValueError("Unsupported operation: " + operation["kind"])
+            balances[operation["to"]] = balances.get(operation["to"], 0) + amount
+        return balances
+
+    def total_supply_at(self, level):
+        return sum(self.balances_at(level).values())
+
+    def balance_info(self, address, level):
+        """The balanceInfo view of the lite token at the end of the level: the balance, and the level of its last
+        change."""
+        last_change = 0
+        for operation in self.operations:
+            if operation["level"] > level:
+                break
+            if address in (operation.get("from"), operation["to"]):
+                last_change = operation["level"]
+        return {"balance": self.balances_at(level).get(address, 0), "level": last_change}
+
+
+# Node covering no leaf
+EMPTY_NODE = (b"", 0)
+
+
+def address_key(address):
+    """Sort key of an address, as compared by Michelson."""
+    return bytes.fromhex(micheline.address(address)["bytes"])
+
+
+def leaf_node(address, balance):
+    """Node of a leaf, following the layout of SNAPSHOT_LEAF_TYPE."""
+    leaf = micheline.pair(micheline.address(address), micheline.nat(balance))
+    return micheline.blake2b(micheline.pack(leaf)), balance
+
+
+def parent_node(left, right):
+    """Parent of two nodes, following the layout of SNAPSHOT_PARENT_TYPE. The parent of two empty nodes is empty."""
+    if left == EMPTY_NODE and right == EMPTY_NODE:
+        return EMPTY_NODE
+    parent = micheline.pair(
+        micheline.pair(micheline.raw_bytes(left[0]), micheline.nat(left[1])),
+        micheline.pair(micheline.raw_bytes(right[0]), micheline.nat(right[1])),
+        micheline.nat(left[1] + right[1]),
+    )
+    return micheline.blake2b(micheline.pack(parent)), left[1] + right[1]
+
+
+def tree_depth(size):
+    """Depth of the leaves of a tree with size leaves."""
+    return (size - 1).bit_length() if size > 1 else 0
+
+
+def build_tree(nodes):
+    """Returns the levels of the tree, from the leaves up to the root. The leaves are padded with empty nodes."""
+    levels = [nodes + [EMPTY_NODE] * (2 ** tree_depth(len(nodes)) - len(nodes))]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        levels.append([parent_node(level[i], level[i + 1]) for i in range(0, len(level), 2)])
+    return levels
+
+
+def proof(levels, index):
+    """Proof steps of the leaf at the index, from the leaf up to the root."""
+    steps = []
+    for level in levels[:-1]:
+        node = level[index ^ 1]
+        steps.append({"sibling": {"hash": node[0].hex(), "total": node[1]}, "is_left": index % 2 == 1})
+        index //= 2
+    return steps
+
+
+def root_of(address, balance, steps):
+    """Root node computed from a leaf and its proof, as by the snapshot_root lambda of the DAO."""
+    node = leaf_node(address, balance)
+    for step in steps:
+        sibling = (bytes.fromhex(step["sibling"]["hash"]), step["sibling"]["total"])
+        node = parent_node(sibling, node) if step["is_left"] else parent_node(node, sibling)
+    return node
+
+
+def build_snapshot(balances):
+    """Builds the snapshot of a dict of address -> balance. Holders without a balance are left out."""
+    holders = sorted((address for address, balance in balances.items() if balance > 0), key=address_key)
+
+    levels = build_tree([leaf_node(address, balances[address]) for address in holders])
+    root_hash, total_supply = levels[-1][0]
+
+    return {
+        "root": root_hash.hex(),
+        "total_supply": total_supply,
+        "depth": tree_depth(len(holders)),
+        "size": len(holders),
+        "holders": {
+            address: {"balance": balances[address], "index": index, "proof": proof(levels, index)}
+            for index, address in enumerate(holders)
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the balance tree of a FlowDAO proposal in snapshot mode.")
+    parser.add_argument("operations", help="JSONL file with the token operations, replayed by a local node")
+    parser.add_argument("--level", type=int, required=True, help="Level of the checkpoint of the proposal")
+    args = parser.parse_args()
+
+    node = LocalNode.from_jsonl(args.operations)
+    snapshot = build_snapshot(node.balances_at(args.level))
+
+    print(json.dumps(dict(level=args.level, **snapshot), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Encodes and decodes the FlowDAO big_map values of both storage layouts.
+
+Layout 0 is the original layout-
+
+    proposals : proposal_metadata as an "ipfs://..." string, a single proposal_lambda, and a proposal_timelock pair
+                of (ending, activated)
+    voters    : a pair of (votes, value)
+
+Layout 1 is the compact layout specified in types/proposal.py-
+
+    proposals : proposal_metadata as the raw bytes of the CID, a list of proposal_lambdas executed one per step,
+                a single timelock_end timestamp, and the space_id and fast_track flag of the proposal
+    voters    : a single nat, votes * 2 + value
+
+Indexers following DAOs deployed with either layout can pass the Micheline JSON of a big_map value to decode_proposal
+or decode_ballot. The layout is detected from the value, and the same dict is returned for both.
+"""
+
+import base64
+import datetime
+
+import micheline
+
+LAYOUT_LEGACY = 0
+LAYOUT_COMPACT = 1
+
+# Mirrors PROPOSAL_STATUS_TIMELOCKED in types/proposal.py
+PROPOSAL_STATUS_TIMELOCKED = 1
+
+########
+# CIDs
+########
+
+
+def cid_to_bytes(uri):
+    """Returns the raw bytes of an IPFS CID, given as "ipfs://<cid>" or "<cid>"."""
+    cid = uri[len("ipfs://") :] if uri.startswith("ipfs://") else uri
+    if cid.startswith("Qm"):
+        return micheline.b58decode(cid)
+    if cid.startswith("b"):
+        body = cid[1:].upper()
+        return base64.b32decode(body + "=" * (-len(body) % 8))
+    raise ValueError("Unsupported CID: " + cid)
+
+
+def bytes_to_cid(raw):
+    """Inverse of cid_to_bytes: returns the "ipfs://<cid>" form of the raw bytes of a CID."""
+    if len(raw) == 34 and raw[:2] == b"\x12\x20":
+        return "ipfs://" + micheline.b58encode(raw)
+    return "ipfs://b" + base64.b32encode(raw).decode("ascii").lower().rstrip("=")
+
+
+###########
+# Encoding
+###########
+
+
+def encode_proposal(proposal, layout):
+    """Builds the optimized Micheline value stored in the proposals big_map.
+
+    proposal is a dict with the keys returned by decode_proposal. Timestamps are in seconds since epoch. The legacy
+    layout only holds proposals of a single lambda in the root space, none of them fast-tracked.
+    """
+    if layout == LAYOUT_LEGACY:
+        metadata = micheline.string(proposal["proposal_metadata"])
+        (lambdas,) = proposal["proposal_lambdas"]
+        timelock = micheline.pair(
+            micheline.nat(proposal["timelock_end"]),
+            {"prim": "True" if proposal["status"] == PROPOSAL_STATUS_TIMELOCKED else "False"},
+        )
+    else:
+        metadata = micheline.raw_bytes(cid_to_bytes(proposal["proposal_metadata"]))
+        lambdas = proposal["proposal_lambdas"]
+        timelock = micheline.nat(proposal["timelock_end"])
+
+    fields = [
+        micheline.nat(proposal["up_votes"]),
+        micheline.nat(proposal["down_votes"]),
+        metadata,
+        lambdas,
+        timelock,
+        micheline.nat(proposal["voting_end"]),
+        micheline.address(proposal["creator"]),
+        micheline.nat(proposal["origin_level"]),
+        micheline.nat(proposal["status"]),
+    ]
+    if layout == LAYOUT_COMPACT:
+        fields.append(micheline.nat(proposal["space_id"]))
+        fields.append({"prim": "True" if proposal["fast_track"] else "False"})
+    return micheline.pair(*fields)
+
+
+def encode_ballot(votes, value, layout):
+    """Builds the optimized Micheline value stored in the voters big_map."""
+    if layout == LAYOUT_LEGACY:
+        return micheline.pair(micheline.nat(votes), micheline.nat(value))
+    return micheline.nat(votes * 2 + value)
+
+
+###########
+# Decoding
+###########
+
+
+def _fields(node):
+    # Flattens a right-combed pair, given either as nested or as n-ary Pair nodes
+    if isinstance(node, dict) and node.get("prim") == "Pair":
+        return node["args"][:-1] + _fields(node["args"][-1])
+    return [node]
+
+
+def _int(node):
+    return int(node["int"])
+
+
+def _timestamp(node):
+    # Readable timestamps are RFC 3339 strings
+    if "int" in node:
+        return int(node["int"])
+    value = datetime.datetime.fromisoformat(node["string"].replace("Z", "+00:00"))
+    return int(value.timestamp())
+
+
+def _address(node):
+    if "string" in node:
+        return node["string"]
+    return micheline.address_from_bytes(bytes.fromhex(node["bytes"]))
+
+
+def decode_proposal(node):
+    """Decodes a value of the proposals big_map in either layout."""
+    fields = _fields(node)
+
+    if len(fields) == 9:
+        layout = LAYOUT_LEGACY
+        metadata = fields[2]["string"]
+        lambdas = [fields[3]]
+        timelock_end = _timestamp(_fields(fields[4])[0])
+        space_id = 0
+        fast_track = False
+    elif len(fields) == 11:
+        layout = LAYOUT_COMPACT
+        metadata = bytes_to_cid(bytes.fromhex(fields[2]["bytes"]))
+        lambdas = fields[3]
+        timelock_end = _timestamp(fields[4])
+        space_id = _int(fields[9])
+        fast_track = fields[10]["prim"] == "True"
+    else:
+        raise ValueError("Not a proposal value")
+
+    return {
+        "layout": layout,
+        "up_votes": _int(fields[0]),
+        "down_votes": _int(fields[1]),
+        "proposal_metadata": metadata,
+        "proposal_lambdas": lambdas,
+        "timelock_end": timelock_end,
+        "voting_end": _timestamp(fields[5]),
+        "creator": _address(fields[6]),
+        "origin_level": _int(fields[7]),
+        "status": _int(fields[8]),
+        "space_id": space_id,
+        "fast_track": fast_track,
+    }
+
+
+def decode_ballot(node):
+    """Decodes a value of the voters big_map in either layout."""
+    if "int" in node:
+        return {"layout": LAYOUT_COMPACT, "votes": _int(node) // 2, "value": _int(node) % 2}
+
+    votes, value = _fields(node)
+    return {"layout": LAYOUT_LEGACY, "votes": _int(votes), "value": _int(value)}
@@ -0,0 +1,73 @@
+"""Reports the storage burn of FlowDAO proposals and ballots in the legacy and compact layouts.
+
+Sizes are those of the binary Micheline values written to the proposals and voters big_maps (see
+storage_layouts.py). Every new big_map entry also pays for a fixed 65 bytes of key overhead, which is the same in both
+layouts and is left out of the comparison.
+
+Usage:
+
+    $ python tools/storage_report.py [--cid Qm...] [--votes 20000000000000000000000] [--cost-per-byte 250]
+
+Proposals of a single empty lambda are compared.
+"""
+
+import argparse
+
+import micheline
+import storage_layouts
+
+SAMPLE_CID = "ipfs://QmWsnPbQfpKusSoPm6wpbBnAKarPhsG6uWiueaGgUdKhMZ"
+SAMPLE_CREATOR = "tz1VSUr8wwNhLAzempoch5d6hLRiTh8Cjcjb"
+
+# Protocol storage cost, in mutez per byte
+COST_PER_BYTE = 250
+
+
+def proposal_sizes(cid, status, timelock_end):
+    proposal = {
+        "up_votes": 150_000 * 10**18,
+        "down_votes": 50_000 * 10**18,
+        "proposal_metadata": cid,
+        "proposal_lambdas": [[]],
+        "timelock_end": timelock_end,
+        "voting_end": 1_700_000_000,
+        "creator": SAMPLE_CREATOR,
+        "origin_level": 3_000_000,
+        "status": status,
+        "space_id": 0,
+        "fast_track": False,
+    }
+    return [
+        len(micheline.encode(storage_layouts.encode_proposal(proposal, layout)))
+        for layout in (storage_layouts.LAYOUT_LEGACY, storage_layouts.LAYOUT_COMPACT)
+    ]
+
+
+def ballot_sizes(votes):
+    return [
+        len(micheline.encode(storage_layouts.encode_ballot(votes, 1, layout)))
+        for layout in (storage_layouts.LAYOUT_LEGACY, storage_layouts.LAYOUT_COMPACT)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the storage burn of the FlowDAO storage layouts.")
+    parser.add_argument("--cid", default=SAMPLE_CID, help="IPFS CID of the proposal metadata")
+    parser.add_argument("--votes", type=int, default=20_000 * 10**18, help="Voting weight of the ballot")
+    parser.add_argument("--cost-per-byte", type=int, default=COST_PER_BYTE, help="Storage cost in mutez per byte")
+    args = parser.parse_args()
+
+    rows = [
+        ("proposal, registered", proposal_sizes(args.cid, 0, 0)),
+        ("proposal, timelocked", proposal_sizes(args.cid, 1, 1_700_086_400)),
+        ("ballot", ballot_sizes(args.votes)),
+    ]
+
+    print("%-22s %12s %12s %12s %14s" % ("value", "legacy (B)", "compact (B)", "saved (B)", "saved (mutez)"))
+    for name, (legacy, compact) in rows:
+        saved = legacy - compact
+        print("%-22s %12d %12d %12d %14d" % (name, legacy, compact, saved, saved * args.cost_per_byte))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Generates synthetic governance workloads: JSONL traces of token and DAO operations for benchmarks.
+
+Holders follow a Zipf distribution: the holder of rank r owns a share of the supply proportional to 1 / r^s, and
+sends transfers at a rate proportional to 1 / r^a, so a few large holders (e.g pools) dominate both the supply and
+the transfers. A transfer sends a random share of the balance of the sender, and picks its recipient in proportion
+to 1 / r^(s + a), which balances the expected flows in and out of every holder: the distribution of the supply
+keeps its shape over the trace. Proposals are registered at a random cadence by holders above the proposal
+threshold, and each holder with a balance at origin_level - 1 votes with the probability of the turnout. A share of
+the proposals is attempted by holders below the threshold instead, and carries the error it is expected to fail with.
+
+Every other operation of the trace is valid when replayed in order, as the generator tracks the balance snapshots with
+the ledger model of tools/simulator.py. Amounts are raw token units, as in flow_dao.py, so the proposal threshold and
+the quorum of a trace are given as they are set in the DAO. The trace has the format read by tools/simulator.py and
+tools/snapshot_tree.py, and is replayed by the SmartPy scenarios (helpers/trace.py) and by tools/mockup_runner.py-
+
+    {"level": 1, "kind": "mint", "to": "tz1...", "amount": 100}
+    {"level": 2, "kind": "transfer", "from": "tz1...", "to": "tz1...", "amount": 40}
+    {"level": 3, "kind": "propose", "creator": "tz1..."}
+    {"level": 3, "kind": "propose", "creator": "tz1...", "error": "NOT_ENOUGH_TOKENS"}
+    {"level": 4, "kind": "vote", "voter": "tz1...", "proposal": 1, "vote_value": 0}
+    {"level": 11524, "kind": "end_voting", "proposal": 1}
+
+Voting periods are given in seconds, as in the DAO, and converted to levels with the block time. The addresses of
+the holders are derived from the seed, so a trace can be regenerated from its parameters alone.
+
+Usage:
+
+    $ python tools/workload.py --holders 10000 --levels 100000 --seed 1 > trace.jsonl
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import sys
+
+import micheline
+from simulator import SnapshotLedger
+
+# Token amounts are raw units, as in flow_dao.py
+DECIMALS = 1
+
+DAY = 86400  # Seconds in a day
+
+# Vote values, as in types/proposal.py
+VOTE_VALUE_UPVOTE = 0
+VOTE_VALUE_DOWNVOTE = 1
+
+
+def holder_address(seed, rank):
+    """tz1 address of the holder of a rank. It has no known key, so it is only usable where signatures are not
+    checked (SmartPy scenarios, and tools/mockup_runner.py, which maps it to a generated key)."""
+    digest = micheline.blake2b(("workload:%d:%d" % (seed, rank)).encode())[:20]
+    return micheline.b58encode_check(micheline.PREFIXES["tz1"] + digest)
+
+
+def zipf_weights(count, exponent):
+    return [1 / rank**exponent for rank in range(1, count + 1)]
+
+
+def poisson(rng, mean):
+    """Number of events of a Poisson process over one unit of time. Knuth's method, for small means."""
+    if mean > 30:
+        return max(0, round(rng.gauss(mean, math.sqrt(mean))))
+    threshold, count, product = math.exp(-mean), 0, rng.random()
+    while product > threshold:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+class Workload:
+    """Generator of a trace. The parameters are those of the command line."""
+
+    def __init__(
+        self,
+        holders=1000,
+        supply=1_000_000 * DECIMALS,
+        levels=20_000,
+        zipf_exponent=1.1,
+        activity_exponent=1.5,
+        transfers_per_level=1.0,
+        transfer_share=0.05,
+        proposal_interval=5_000,
+        turnout=0.3,
+        approval=0.6,
+        ineligible_proposals=0.0,
+        proposal_threshold=50_000 * DECIMALS,
+        voting_period=2 * DAY,
+        block_time=15,
+        seed=0,
+    ):
+        self.rng = random.Random(seed)
+        self.addresses = [holder_address(seed, rank) for rank in range(1, holders + 1)]
+        self.supply = supply
+        self.levels = levels
+        self.shares = zipf_weights(holders, zipf_exponent)
+        self.activity = zipf_weights(holders, activity_exponent)
+        self.cumulative_activity = list(itertools.accumulate(self.activity))
+        self.cumulative_receiving = list(
+            itertools.accumulate(activity * share for activity, share in zip(self.activity, self.shares))
+        )
+        self.transfers_per_level = transfers_per_level
+        self.transfer_share = transfer_share
+        self.proposal_interval = proposal_interval
+        self.turnout = turnout
+        self.approval = approval
+        self.ineligible_proposals = ineligible_proposals
+        self.proposal_threshold = proposal_threshold
+        self.voting_levels = voting_period // block_time
+
+        self.ledger = SnapshotLedger()
+        self.proposals = 0
+
+    def mints(self):
+        """Mints the supply at level 1, split by the Zipf shares. The rounding remainder goes to the first rank."""
+        total = sum(self.shares)
+        amounts = [int(self.supply * share / total) for share in self.shares]
+        amounts[0] += self.supply - sum(amounts)
+        for address, amount in zip(self.addresses, amounts):
+            if amount > 0:
+                self.ledger.mint(address, amount, 1)
+                yield {"level": 1, "kind": "mint", "to": address, "amount": amount}
+
+    def transfers(self, level):
+        for _ in range(poisson(self.rng, self.transfers_per_level)):
+            from_ = self.rng.choices(self.addresses, cum_weights=self.cumulative_activity)[0]
+            to_ = self.rng.choices(self.addresses, cum_weights=self.cumulative_receiving)[0]
+            balance = self.ledger.balances.get(from_, 0)
+            if from_ == to_ or balance == 0:
+                continue
+            amount = max(1, int(balance * self.rng.uniform(0, 2 * self.transfer_share)))
+            self.ledger.transfer(from_, to_, amount, level)
+            yield {"level": level, "kind": "transfer", "from": from_, "to": to_, "amount": amount}
+
+    def proposal(self, level):
+        """Registers a proposal by an eligible holder, picked by activity, and schedules its votes and end. With the
+        probability of ineligible_proposals, a holder below the threshold attempts it instead, and it is expected to
+        fail."""
+        snapshot = self.ledger.balances_at(self.addresses, level - 1)
+        eligible = [index for index, balance in enumerate(snapshot) if balance >= self.proposal_threshold]
+        ineligible = [index for index, balance in enumerate(snapshot) if balance < self.proposal_threshold]
+        if ineligible and self.rng.random() < self.ineligible_proposals:
+            creator = self.rng.choices(ineligible, weights=[self.activity[index] for index in ineligible])[0]
+            return None, [
+                {"level": level, "kind": "propose", "creator": self.addresses[creator], "error": "NOT_ENOUGH_TOKENS"}
+            ]
+        if not eligible:
+            return None, []
+
+        creator = self.rng.choices(eligible, weights=[self.activity[index] for index in eligible])[0]
+        self.proposals += 1
+        operations = [{"level": level, "kind": "propose", "creator": self.addresses[creator]}]
+
+        # Votes are cast before the voting end, at level + voting_levels
+        for index, balance in enumerate(snapshot):
+            if balance > 0 and self.rng.random() < self.turnout:
+                operations.append(
+                    {
+                        "level": self.rng.randint(level + 1, level + max(1, self.voting_levels - 1)),
+                        "kind": "vote",
+                        "voter": self.addresses[index],
+                        "proposal": self.proposals,
+                        "vote_value": VOTE_VALUE_UPVOTE if self.rng.random() < self.approval else VOTE_VALUE_DOWNVOTE,
+                    }
+                )
+
+        # The first level after the voting period
+        operations.append({"level": level + self.voting_levels + 1, "kind": "end_voting", "proposal": self.proposals})
+        return self.proposals, operations
+
+    def generate(self):
+        """Yields the operations of the trace, ordered by level."""
+        yield from self.mints()
+
+        # Votes and ends of voting scheduled for later levels, by level
+        scheduled = {}
+        next_proposal = 2 + int(self.rng.expovariate(1 / self.proposal_interval)) if self.proposal_interval else None
+
+        for level in range(2, self.levels + 1):
+            # Proposals come first in a level, so that the transfers of the level do not change the balance snapshot
+            if level == next_proposal:
+                _, operations = self.proposal(level)
+                for operation in operations:
+                    scheduled.setdefault(operation["level"], []).append(operation)
+                next_proposal = level + 1 + int(self.rng.expovariate(1 / self.proposal_interval))
+
+            yield from scheduled.pop(level, [])
+            yield from self.transfers(level)
+
+        # Votes and ends of voting past the last level
+        for level in sorted(scheduled):
+            yield from scheduled[level]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic trace of token and DAO operations.")
+    parser.add_argument("--holders", type=int, default=1000, help="Number of holders")
+    parser.add_argument("--supply", type=int, default=1_000_000 * DECIMALS, help="Total supply minted at level 1")
+    parser.add_argument("--levels", type=int, default=20_000, help="Levels of transfers and proposals")
+    parser.add_argument("--zipf-exponent", type=float, default=1.1, help="Exponent of the distribution of the supply")
+    parser.add_argument("--activity-exponent", type=float, default=1.5, help="Exponent of the transfer rates")
+    parser.add_argument("--transfers-per-level", type=float, default=1.0, help="Mean number of transfers per level")
+    parser.add_argument("--transfer-share", type=float, default=0.05, help="Mean share of its balance a holder sends")
+    parser.add_argument(
+        "--proposal-interval", type=int, default=5_000, help="Mean levels between proposals, 0 for none"
+    )
+    parser.add_argument("--turnout", type=float, default=0.3, help="Probability of a holder voting on a proposal")
+    parser.add_argument("--approval", type=float, default=0.6, help="Probability of a vote being an up-vote")
+    parser.add_argument(
+        "--ineligible-proposals", type=float, default=0.0, help="Share of proposals attempted below the threshold"
+    )
+    parser.add_argument("--proposal-threshold", type=int, default=50_000 * DECIMALS, help="As in the DAO")
+    parser.add_argument("--voting-period", type=int, default=2 * DAY, help="Voting period of the DAO, in seconds")
+    parser.add_argument("--block-time", type=int, default=15, help="Seconds per level")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workload = Workload(**vars(args))
+    for operation in workload.generate():
+        sys.stdout.write(json.dumps(operation) + "\n")
+
+
+if __name__ == "__main__":
+    main()
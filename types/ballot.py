@@ -0,0 +1,50 @@
+import smartpy as sp
+
+# params:
+#   public_key  : Public key of the voter who signed the ballot
+#   signature   : Signature over the packed BALLOT_PAYLOAD_TYPE value
+#   proposal_id : The id of the proposal being voted upon
+#   vote_value  : Up-vote (0) or down-vote (1)
+BALLOT_TYPE = sp.TRecord(
+    public_key=sp.TKey,
+    signature=sp.TSignature,
+    proposal_id=sp.TNat,
+    vote_value=sp.TNat,
+).layout(
+    (
+        "public_key",
+        (
+            "signature",
+            (
+                "proposal_id",
+                "vote_value",
+            ),
+        ),
+    ),
+)
+
+# The value that is packed and signed by a voter. Binding the DAO address and the chain id
+# prevents a ballot from being replayed on another deployment or network. A ballot cannot be replayed
+# on the same proposal either, as a voter votes only once on it.
+# params:
+#   dao         : Address of the DAO contract
+#   chain_id    : Chain id of the network the DAO is deployed on
+#   proposal_id : The id of the proposal being voted upon
+#   vote_value  : Up-vote (0) or down-vote (1)
+BALLOT_PAYLOAD_TYPE = sp.TRecord(
+    dao=sp.TAddress,
+    chain_id=sp.TChainId,
+    proposal_id=sp.TNat,
+    vote_value=sp.TNat,
+).layout(
+    (
+        "dao",
+        (
+            "chain_id",
+            (
+                "proposal_id",
+                "vote_value",
+            ),
+        ),
+    ),
+)
@@ -22,3 +22,48 @@ GOVERNANCE_PARAMETERS_TYPE = sp.TRecord(
         ),
     ),
 )
+
+# Params:
+#   voting_period   : The length of the fast-track voting period in seconds
+#   timelock_period : Length of the execution timelock of a fast-track proposal in seconds
+#   veto_quorum     : Number of down-votes which reject a fast-track proposal. Fast-track proposals pass otherwise
+FAST_TRACK_PARAMETERS_TYPE = sp.TRecord(
+    voting_period=sp.TInt,
+    timelock_period=sp.TInt,
+    veto_quorum=sp.TNat,
+).layout(
+    (
+        "voting_period",
+        (
+            "timelock_period",
+            "veto_quorum",
+        ),
+    ),
+)
+
+# Params:
+#   governance_parameters : Parameters which define the governance model of the space
+#   token_address         : Address of the governance token of the space
+#   executor              : Contract running the lambdas of the space's passing proposals. None for the root space,
+#                           whose lambdas are run by the DAO itself, and for spaces whose executor is not deployed yet
+#   proposal_count        : Number of proposals registered in the space, and the space id of its latest proposal
+SPACE_TYPE = sp.TRecord(
+    governance_parameters=GOVERNANCE_PARAMETERS_TYPE,
+    token_address=sp.TAddress,
+    executor=sp.TOption(sp.TAddress),
+    proposal_count=sp.TNat,
+).layout(
+    (
+        "governance_parameters",
+        (
+            "token_address",
+            (
+                "executor",
+                "proposal_count",
+            ),
+        ),
+    ),
+)
+
+# The space created along with the DAO. Its proposals govern the DAO itself.
+ROOT_SPACE_ID = 0
@@ -13,6 +13,12 @@ NOT_ENOUGH_TOKENS = "NOT_ENOUGH_TOKENS"
 # Generic not allowed error
 NOT_ALLOWED = "NOT_ALLOWED"
 
+# Proposal batch is empty
+EMPTY_PROPOSAL_LIST = "EMPTY_PROPOSAL_LIST"
+
+# Multi-step proposal has no lambdas
+EMPTY_PROPOSAL_STEPS = "EMPTY_PROPOSAL_STEPS"
+
 # Invalid proposal id
 INVALID_PROPOSAL_ID = "INVALID_PROPOSAL_ID"
 
@@ -42,3 +48,153 @@ INVALID_GOVERNANCE_TOKEN = "INVALID_GOVERNANCE_TOKEN"
 
 # Invalid token contract provided in the community fund transfer entrypoints
 INVALID_TOKEN_CONTRACT = "INVALID_TOKEN_CONTRACT"
+
+# Ballot signature does not match the ballot's public key
+INVALID_SIGNATURE = "INVALID_SIGNATURE"
+
+# Tally posting is not allowed for the proposal at this time
+TALLY_POSTING_CLOSED = "TALLY_POSTING_CLOSED"
+
+# Tally posting window of a proposal is still open
+TALLY_POSTING_ONGOING = "TALLY_POSTING_ONGOING"
+
+# A tally is already posted for the proposal
+TALLY_ALREADY_POSTED = "TALLY_ALREADY_POSTED"
+
+# No tally is posted for the proposal
+TALLY_NOT_FOUND = "TALLY_NOT_FOUND"
+
+# Challenge window of the tally is still open
+TALLY_CHALLENGE_ONGOING = "TALLY_CHALLENGE_ONGOING"
+
+# Challenge window of the tally is closed
+TALLY_CHALLENGE_CLOSED = "TALLY_CHALLENGE_CLOSED"
+
+# Merkle proof does not lead to the posted root
+INVALID_PROOF = "INVALID_PROOF"
+
+# Challenge did not demonstrate a fault in the tally
+TALLY_NOT_FRAUDULENT = "TALLY_NOT_FRAUDULENT"
+
+# An opening of a node of the tally is already pending
+TALLY_OPENING_PENDING = "TALLY_OPENING_PENDING"
+
+# No opening of a node of the tally is pending
+TALLY_OPENING_NOT_FOUND = "TALLY_OPENING_NOT_FOUND"
+
+# The deadline to open the requested node of the tally has passed
+TALLY_OPENING_EXPIRED = "TALLY_OPENING_EXPIRED"
+
+# The deadline to open the requested node of the tally has not passed yet
+TALLY_OPENING_ONGOING = "TALLY_OPENING_ONGOING"
+
+# Aggregated tallies are not allowed in a snapshot space
+TALLY_NOT_ALLOWED = "TALLY_NOT_ALLOWED"
+
+# Amount sent does not match the required bond
+INVALID_BOND = "INVALID_BOND"
+
+# Space does not exist
+INVALID_SPACE_ID = "INVALID_SPACE_ID"
+
+# Proposals of a batch belong to different spaces
+MIXED_SPACES = "MIXED_SPACES"
+
+# Space executor does not accept proposal lambdas
+INVALID_EXECUTOR = "INVALID_EXECUTOR"
+
+# Executor of the space has not been deployed yet
+EXECUTOR_NOT_DEPLOYED = "EXECUTOR_NOT_DEPLOYED"
+
+# Executor of the space has already been deployed
+EXECUTOR_ALREADY_DEPLOYED = "EXECUTOR_ALREADY_DEPLOYED"
+
+# Proposal is neither executed nor rejected
+PROPOSAL_NOT_FINALISED = "PROPOSAL_NOT_FINALISED"
+
+# Retention period of a finalised proposal is not over
+RETENTION_PERIOD_ONGOING = "RETENTION_PERIOD_ONGOING"
+
+# Fast-track lane is not enabled in the space
+FAST_TRACK_DISABLED = "FAST_TRACK_DISABLED"
+
+# Proposal lambda is not in the fast-track allow-list of the space
+LAMBDA_NOT_FAST_TRACKED = "LAMBDA_NOT_FAST_TRACKED"
+
+# Snapshot mode is not enabled in the space
+SNAPSHOT_DISABLED = "SNAPSHOT_DISABLED"
+
+# Votes in a snapshot space are cast with a Merkle proof of the voter's balance
+SNAPSHOT_PROOF_REQUIRED = "SNAPSHOT_PROOF_REQUIRED"
+
+# Balance of the sender changed in the current block level
+BALANCE_NOT_FINALIZED = "BALANCE_NOT_FINALIZED"
+
+# Snapshot posting is not allowed for the proposal at this time
+SNAPSHOT_POSTING_CLOSED = "SNAPSHOT_POSTING_CLOSED"
+
+# A snapshot is already posted for the proposal
+SNAPSHOT_ALREADY_POSTED = "SNAPSHOT_ALREADY_POSTED"
+
+# No snapshot is posted for the proposal
+SNAPSHOT_NOT_FOUND = "SNAPSHOT_NOT_FOUND"
+
+# Challenge window of the snapshot is still open
+SNAPSHOT_CHALLENGE_ONGOING = "SNAPSHOT_CHALLENGE_ONGOING"
+
+# Challenge window of the snapshot is closed
+SNAPSHOT_CHALLENGE_CLOSED = "SNAPSHOT_CHALLENGE_CLOSED"
+
+# Challenge did not demonstrate a fault in the snapshot
+SNAPSHOT_NOT_FRAUDULENT = "SNAPSHOT_NOT_FRAUDULENT"
+
+# Depth or size of the snapshot tree is not valid
+INVALID_SNAPSHOT_SIZE = "INVALID_SNAPSHOT_SIZE"
+
+# The token no longer keeps the checkpoint of the snapshot
+SNAPSHOT_CHECKPOINT_EXPIRED = "SNAPSHOT_CHECKPOINT_EXPIRED"
+
+# An opening of a node of the snapshot is already pending
+SNAPSHOT_OPENING_PENDING = "SNAPSHOT_OPENING_PENDING"
+
+# No opening of a node of the snapshot is pending
+SNAPSHOT_OPENING_NOT_FOUND = "SNAPSHOT_OPENING_NOT_FOUND"
+
+# The deadline to open the requested node of the snapshot has passed
+SNAPSHOT_OPENING_EXPIRED = "SNAPSHOT_OPENING_EXPIRED"
+
+# The deadline to open the requested node of the snapshot has not passed yet
+SNAPSHOT_OPENING_ONGOING = "SNAPSHOT_OPENING_ONGOING"
+
+# Distribution does not exist
+INVALID_DISTRIBUTION_ID = "INVALID_DISTRIBUTION_ID"
+
+# Claim window of the distribution is over
+DISTRIBUTION_EXPIRED = "DISTRIBUTION_EXPIRED"
+
+# Leaf of the distribution is already claimed
+ALREADY_CLAIMED = "ALREADY_CLAIMED"
+
+# Claim exceeds the cap of the distribution for the asset
+DISTRIBUTION_CAP_EXCEEDED = "DISTRIBUTION_CAP_EXCEEDED"
+
+# Stream does not exist
+INVALID_STREAM_ID = "INVALID_STREAM_ID"
+
+# Stream must start before its end, with its cliff in between
+INVALID_STREAM_PERIOD = "INVALID_STREAM_PERIOD"
+
+# Nothing has vested since the last withdrawal
+NOTHING_TO_WITHDRAW = "NOTHING_TO_WITHDRAW"
+
+# Allowance of the spender is expired
+ALLOWANCE_EXPIRED = "ALLOWANCE_EXPIRED"
+
+# Transfer exceeds the remaining allowance of the spender
+ALLOWANCE_EXCEEDED = "ALLOWANCE_EXCEEDED"
+
+# Schedule does not exist
+INVALID_SCHEDULE_ID = "INVALID_SCHEDULE_ID"
+
+# Schedule must have a positive interval and at least one payment
+INVALID_SCHEDULE = "INVALID_SCHEDULE"
@@ -0,0 +1,118 @@
+import smartpy as sp
+
+#############
+# Event tags
+#############
+
+PROPOSAL_REGISTERED = "proposal_registered"
+BALLOT_CAST = "ballot_cast"
+VOTING_ENDED = "voting_ended"
+PROPOSAL_STEP_EXECUTED = "proposal_step_executed"
+PROPOSAL_EXECUTED = "proposal_executed"
+PROPOSAL_ARCHIVED = "proposal_archived"
+SPACE_CREATED = "space_created"
+SPACE_EXECUTOR_DEPLOYED = "space_executor_deployed"
+
+##############
+# Event types
+##############
+
+# params:
+#   proposal_id        : The id assigned to the proposal
+#   space_id           : The space in which the proposal is registered
+#   space_proposal_id  : The number of the proposal in its space, starting from 1
+#   creator            : Address of the creator of the proposal
+#   proposal_metadata  : Raw bytes of the IPFS CID of the proposal metadata
+#   voting_end         : The timestamp at which voting ends for the proposal
+#   origin_level       : The block level at which proposal was initiated
+#   fast_track         : True if the proposal is registered in the fast-track lane
+PROPOSAL_REGISTERED_TYPE = sp.TRecord(
+    proposal_id=sp.TNat,
+    space_id=sp.TNat,
+    space_proposal_id=sp.TNat,
+    creator=sp.TAddress,
+    proposal_metadata=sp.TBytes,
+    voting_end=sp.TTimestamp,
+    origin_level=sp.TNat,
+    fast_track=sp.TBool,
+).layout(
+    (
+        "proposal_id",
+        (
+            "space_id",
+            (
+                "space_proposal_id",
+                (
+                    "creator",
+                    (
+                        "proposal_metadata",
+                        (
+                            "voting_end",
+                            ("origin_level", "fast_track"),
+                        ),
+                    ),
+                ),
+            ),
+        ),
+    ),
+)
+
+# params:
+#   proposal_id : The id of the proposal voted upon
+#   voter       : Address of the voter
+#   votes       : The voting weight of the ballot
+#   value       : Up-vote (0) or down-vote (1)
+BALLOT_CAST_TYPE = sp.TRecord(
+    proposal_id=sp.TNat,
+    voter=sp.TAddress,
+    votes=sp.TNat,
+    value=sp.TNat,
+).layout(("proposal_id", ("voter", ("votes", "value"))))
+
+# params:
+#   proposal_id : The id of the proposal
+#   status      : PROPOSAL_STATUS_TIMELOCKED if the proposal passed, else PROPOSAL_STATUS_REJECTED
+#   up_votes    : Final number of votes in favour of the proposal
+#   down_votes  : Final number of votes against the proposal
+VOTING_ENDED_TYPE = sp.TRecord(
+    proposal_id=sp.TNat,
+    status=sp.TNat,
+    up_votes=sp.TNat,
+    down_votes=sp.TNat,
+).layout(("proposal_id", ("status", ("up_votes", "down_votes"))))
+
+# params:
+#   proposal_id     : The id of the proposal
+#   remaining_steps : Number of lambdas of the proposal left to be executed
+PROPOSAL_STEP_EXECUTED_TYPE = sp.TRecord(
+    proposal_id=sp.TNat,
+    remaining_steps=sp.TNat,
+).layout(("proposal_id", "remaining_steps"))
+
+# params:
+#   proposal_id : The id of the executed proposal
+PROPOSAL_EXECUTED_TYPE = sp.TRecord(
+    proposal_id=sp.TNat,
+).layout("proposal_id")
+
+# params:
+#   proposal_id : The id of the archived proposal
+PROPOSAL_ARCHIVED_TYPE = sp.TRecord(
+    proposal_id=sp.TNat,
+).layout("proposal_id")
+
+# params:
+#   space_id      : The id assigned to the space
+#   token_address : Address of the governance token of the space
+SPACE_CREATED_TYPE = sp.TRecord(
+    space_id=sp.TNat,
+    token_address=sp.TAddress,
+).layout(("space_id", "token_address"))
+
+# params:
+#   space_id : The id of the space
+#   executor : Address of the executor originated for the space
+SPACE_EXECUTOR_DEPLOYED_TYPE = sp.TRecord(
+    space_id=sp.TNat,
+    executor=sp.TAddress,
+).layout(("space_id", "executor"))
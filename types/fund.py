@@ -0,0 +1,131 @@
+import smartpy as sp
+
+# Parameter of the transfer entrypoint of an FA1.2 token
+FA12_TRANSFER_TYPE = sp.TRecord(from_=sp.TAddress, to_=sp.TAddress, value=sp.TNat).layout(
+    ("from_ as from", ("to_ as to", "value"))
+)
+
+# Transfers of an FA2 batch from a single owner
+FA2_TRANSFER_TXS_TYPE = sp.TList(
+    sp.TRecord(to_=sp.TAddress, token_id=sp.TNat, amount=sp.TNat).layout(("to_", ("token_id", "amount")))
+)
+
+# Parameter of the transfer entrypoint of an FA2 token
+FA2_TRANSFER_TYPE = sp.TList(sp.TRecord(from_=sp.TAddress, txs=FA2_TRANSFER_TXS_TYPE).layout(("from_", "txs")))
+
+# Variants:
+#   tez  : Tez held by the fund
+#   fa12 : Tokens of the FA1.2 contract at the address
+#   fa2  : Tokens of an FA2 contract, of the given token id
+ASSET_TYPE = sp.TVariant(
+    tez=sp.TUnit,
+    fa12=sp.TAddress,
+    fa2=sp.TRecord(token_address=sp.TAddress, token_id=sp.TNat).layout(("token_address", "token_id")),
+).layout(("tez", ("fa12", "fa2")))
+
+# Params:
+#   asset  : The asset paid
+#   to_    : Address of the payee
+#   amount : Amount paid, in mutez for tez and in the smallest unit of the token otherwise
+PAYMENT_TYPE = sp.TRecord(
+    asset=ASSET_TYPE,
+    to_=sp.TAddress,
+    amount=sp.TNat,
+).layout(("asset", ("to_", "amount")))
+
+################
+# Distributions
+################
+
+# A leaf of a distribution tree
+# params:
+#   index     : Position of the leaf in the tree, which is its bit in the claimed bitmap
+#   recipient : Address of the recipient
+#   asset     : The asset paid
+#   amount    : Amount paid, in mutez for tez and in the smallest unit of the token otherwise
+DISTRIBUTION_LEAF_TYPE = sp.TRecord(
+    index=sp.TNat,
+    recipient=sp.TAddress,
+    asset=ASSET_TYPE,
+    amount=sp.TNat,
+).layout(("index", ("recipient", ("asset", "amount"))))
+
+# A leaf node hashes the packed leaf, and a parent node hashes the packed pair of the hashes of its children
+# params:
+#   sibling : Hash of the sibling node at this height of the tree
+#   is_left : True when the sibling is the left child of the parent node
+DISTRIBUTION_PROOF_STEP_TYPE = sp.TRecord(
+    sibling=sp.TBytes,
+    is_left=sp.TBool,
+).layout(("sibling", "is_left"))
+
+# params:
+#   merkle_root : Hash of the root node of the distribution tree
+#   caps        : Maximum total amount claimable per asset. Assets without a cap cannot be claimed
+#   claimed     : Total amount claimed per asset
+#   expiry      : The timestamp after which nothing can be claimed
+DISTRIBUTION_TYPE = sp.TRecord(
+    merkle_root=sp.TBytes,
+    caps=sp.TMap(ASSET_TYPE, sp.TNat),
+    claimed=sp.TMap(ASSET_TYPE, sp.TNat),
+    expiry=sp.TTimestamp,
+).layout(("merkle_root", ("caps", ("claimed", "expiry"))))
+
+# Number of leaves covered by a single word of the claimed bitmap
+BITMAP_WORD_SIZE = 256
+
+##########
+# Streams
+##########
+
+# params:
+#   recipient : Address of the recipient, the only address allowed to withdraw
+#   asset     : The asset streamed
+#   total     : Amount vested at the end of the stream
+#   withdrawn : Amount withdrawn by the recipient
+#   start     : The timestamp from which the total vests linearly
+#   end       : The timestamp at which the total is vested
+#   cliff     : The timestamp before which nothing can be withdrawn
+STREAM_TYPE = sp.TRecord(
+    recipient=sp.TAddress,
+    asset=ASSET_TYPE,
+    total=sp.TNat,
+    withdrawn=sp.TNat,
+    start=sp.TTimestamp,
+    end=sp.TTimestamp,
+    cliff=sp.TTimestamp,
+).layout(("recipient", ("asset", ("total", ("withdrawn", ("start", ("end", "cliff")))))))
+
+#############
+# Allowances
+#############
+
+# params:
+#   cap    : Maximum total amount the spender can transfer
+#   spent  : Total amount transferred by the spender
+#   expiry : The timestamp after which the allowance cannot be spent
+ALLOWANCE_TYPE = sp.TRecord(
+    cap=sp.TNat,
+    spent=sp.TNat,
+    expiry=sp.TTimestamp,
+).layout(("cap", ("spent", "expiry")))
+
+############
+# Schedules
+############
+
+# params:
+#   recipient    : Address of the recipient
+#   asset        : The asset paid
+#   amount       : Amount of each payment
+#   interval     : Seconds between two payments
+#   next_payment : The timestamp from which the next payment is due
+#   remaining    : Number of payments left
+SCHEDULE_TYPE = sp.TRecord(
+    recipient=sp.TAddress,
+    asset=ASSET_TYPE,
+    amount=sp.TNat,
+    interval=sp.TInt,
+    next_payment=sp.TTimestamp,
+    remaining=sp.TNat,
+).layout(("recipient", ("asset", ("amount", ("interval", ("next_payment", "remaining"))))))
@@ -2,34 +2,33 @@ import smartpy as sp
 
 PROPOSAL_LAMBDA = sp.TLambda(sp.TUnit, sp.TList(sp.TOperation))
 
-# params:
-#   ending    : The timestamp at which the timelock ends. Set to 0 when timelock is not activated
-#   activated : True when the timelock is activated after proposal passed voting phase
-PROPOSAL_TIMELOCK = sp.TRecord(
-    ending=sp.TTimestamp,
-    activated=sp.TBool,
-).layout(("ending", "activated"))
-
 # params:
 #   up_votes           : Number of votes in favour of the proposal
 #   down_votes         : Number of votes against the proposal
-#   proposal_metadata  : IPFS hash of metadata for the proposal
-#   proposal_lambda    : The lambda to be executed if proposal vote goes through
-#   proposal_timelock  : The timelock on the proposal execution
+#   proposal_metadata  : Raw bytes of the IPFS CID of the proposal metadata
+#   proposal_lambdas   : The lambdas to be executed if proposal vote goes through, one per execute_proposal call.
+#                        Executed lambdas are removed, so the list is empty once the proposal is executed
+#   timelock_end       : The timestamp at which the execution timelock ends. Only meaningful once the proposal
+#                        is PROPOSAL_STATUS_TIMELOCKED, and set to 0 before that
 #   voting_end         : The timestamp at which voting ends for the proposal
 #   creator            : Address of the creator of the proposal
 #   origin_level       : The block level at which proposal was initiated
 #   status             : The current status of the proposal
+#   space_id           : The space in which the proposal is registered
+#   fast_track         : True if the proposal is registered in the fast-track lane of its space, where it passes
+#                        unless vetoed
 PROPOSAL_TYPE = sp.TRecord(
     up_votes=sp.TNat,
     down_votes=sp.TNat,
-    proposal_metadata=sp.TString,
-    proposal_lambda=PROPOSAL_LAMBDA,
-    proposal_timelock=PROPOSAL_TIMELOCK,
+    proposal_metadata=sp.TBytes,
+    proposal_lambdas=sp.TList(PROPOSAL_LAMBDA),
+    timelock_end=sp.TTimestamp,
     voting_end=sp.TTimestamp,
     creator=sp.TAddress,
     origin_level=sp.TNat,
     status=sp.TNat,
+    space_id=sp.TNat,
+    fast_track=sp.TBool,
 ).layout(
     (
         "up_votes",
@@ -38,16 +37,16 @@ PROPOSAL_TYPE = sp.TRecord(
             (
                 "proposal_metadata",
                 (
-                    "proposal_lambda",
+                    "proposal_lambdas",
                     (
-                        "proposal_timelock",
+                        "timelock_end",
                         (
                             "voting_end",
                             (
                                 "creator",
                                 (
                                     "origin_level",
-                                    "status",
+                                    ("status", ("space_id", "fast_track")),
                                 ),
                             ),
                         ),
@@ -58,6 +57,59 @@ PROPOSAL_TYPE = sp.TRecord(
     ),
 )
 
+# The fields of PROPOSAL_TYPE with the number of remaining execution steps in place of the proposal_lambdas, as
+# returned by the DAO views
+PROPOSAL_SUMMARY_TYPE = sp.TRecord(
+    up_votes=sp.TNat,
+    down_votes=sp.TNat,
+    proposal_metadata=sp.TBytes,
+    remaining_steps=sp.TNat,
+    timelock_end=sp.TTimestamp,
+    voting_end=sp.TTimestamp,
+    creator=sp.TAddress,
+    origin_level=sp.TNat,
+    status=sp.TNat,
+    space_id=sp.TNat,
+    fast_track=sp.TBool,
+).layout(
+    (
+        "up_votes",
+        (
+            "down_votes",
+            (
+                "proposal_metadata",
+                (
+                    "remaining_steps",
+                    (
+                        "timelock_end",
+                        (
+                            "voting_end",
+                            (
+                                "creator",
+                                (
+                                    "origin_level",
+                                    ("status", ("space_id", "fast_track")),
+                                ),
+                            ),
+                        ),
+                    ),
+                ),
+            ),
+        ),
+    ),
+)
+
+# What is kept of a proposal once it is archived
+# params:
+#   status     : The final status of the proposal
+#   up_votes   : Number of votes in favour of the proposal
+#   down_votes : Number of votes against the proposal
+PROPOSAL_TOMBSTONE_TYPE = sp.TRecord(
+    status=sp.TNat,
+    up_votes=sp.TNat,
+    down_votes=sp.TNat,
+).layout(("status", ("up_votes", "down_votes")))
+
 #########
 # Status
 #########
@@ -77,3 +129,25 @@ PROPOSAL_STATUS_REJECTED = 3
 
 VOTE_VALUE_UPVOTE = 0
 VOTE_VALUE_DOWNVOTE = 1
+
+##########
+# Ballots
+##########
+
+# A ballot is stored in the voters big_map as a single nat, votes * 2 + value. The vote value is the low bit.
+def encode_ballot(votes, value):
+    return votes * 2 + value
+
+
+# The decoded form of a stored ballot, as returned by the DAO views
+# params:
+#   votes : The voting weight of the ballot
+#   value : Up-vote (0) or down-vote (1)
+BALLOT_RECORD_TYPE = sp.TRecord(
+    votes=sp.TNat,
+    value=sp.TNat,
+).layout(("votes", "value"))
+
+
+def decode_ballot(ballot):
+    return sp.record(votes=ballot // 2, value=ballot % 2)
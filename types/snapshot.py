@@ -0,0 +1,121 @@
+import smartpy as sp
+
+# Params:
+#   challenge_period : Length of the challenge window on a posted snapshot in seconds
+#   bond             : Tez bonded by the snapshot service while posting a snapshot
+SNAPSHOT_PARAMETERS_TYPE = sp.TRecord(
+    challenge_period=sp.TInt,
+    bond=sp.TMutez,
+).layout(("challenge_period", "bond"))
+
+# A leaf of the balance tree
+# params:
+#   address : A token holder
+#   balance : Balance of the holder at the checkpoint of the proposal
+SNAPSHOT_LEAF_TYPE = sp.TRecord(
+    address=sp.TAddress,
+    balance=sp.TNat,
+).layout(("address", "balance"))
+
+# A node of the balance Merkle-sum tree. A leaf node hashes the packed leaf, and its total is the balance of the
+# leaf. A parent node hashes its packed SNAPSHOT_PARENT_TYPE value, so the total of every node is bound into its own
+# hash, and must be the sum of the totals of its children. A node covering no leaf is the empty node (0x, 0).
+SNAPSHOT_NODE_TYPE = sp.TRecord(
+    hash=sp.TBytes,
+    total=sp.TNat,
+).layout(("hash", "total"))
+
+# The value hashed by a parent node
+# params:
+#   left  : The left child node
+#   right : The right child node
+#   total : Total of the parent node
+SNAPSHOT_PARENT_TYPE = sp.TRecord(
+    left=SNAPSHOT_NODE_TYPE,
+    right=SNAPSHOT_NODE_TYPE,
+    total=sp.TNat,
+).layout(("left", ("right", "total")))
+
+# The value hashed by a node, revealed to open it. The empty node has no preimage.
+SNAPSHOT_OPENING_TYPE = sp.TVariant(
+    leaf=SNAPSHOT_LEAF_TYPE,
+    parent=SNAPSHOT_PARENT_TYPE,
+    empty=sp.TUnit,
+).layout(("leaf", ("parent", "empty")))
+
+# A request to reveal the value hashed by a node of the tree
+# params:
+#   node      : The node to be opened
+#   depth     : Depth of the node in the tree
+#   index     : Index of the node at its depth
+#   requester : Address that requested the opening and bonded tez
+#   deadline  : The timestamp until which the node can be opened
+#   bond      : The tez bonded by the requester
+SNAPSHOT_OPENING_REQUEST_TYPE = sp.TRecord(
+    node=SNAPSHOT_NODE_TYPE,
+    depth=sp.TNat,
+    index=sp.TNat,
+    requester=sp.TAddress,
+    deadline=sp.TTimestamp,
+    bond=sp.TMutez,
+).layout(("node", ("depth", ("index", ("requester", ("deadline", "bond"))))))
+
+# params:
+#   poster         : Address that posted the snapshot and bonded tez
+#   root           : Hash of the root node of the balance Merkle-sum tree
+#   total_supply   : Total of the root node i.e the total supply at the checkpoint of the proposal
+#   depth          : Depth of the leaves of the tree
+#   size           : Number of leaves. They fill the first positions at the depth of the leaves, sorted by address.
+#   challenge_end  : The timestamp at which the challenge window closes
+#   bond           : The tez bonded by the poster
+#   opening        : The pending request to open a node of the tree, if any
+SNAPSHOT_TYPE = sp.TRecord(
+    poster=sp.TAddress,
+    root=sp.TBytes,
+    total_supply=sp.TNat,
+    depth=sp.TNat,
+    size=sp.TNat,
+    challenge_end=sp.TTimestamp,
+    bond=sp.TMutez,
+    opening=sp.TOption(SNAPSHOT_OPENING_REQUEST_TYPE),
+).layout(
+    (
+        "poster",
+        ("root", ("total_supply", ("depth", ("size", ("challenge_end", ("bond", "opening")))))),
+    )
+)
+
+# params:
+#   sibling : The sibling node at this height of the tree
+#   is_left : True when the sibling is the left child of the parent node
+SNAPSHOT_PROOF_STEP_TYPE = sp.TRecord(
+    sibling=SNAPSHOT_NODE_TYPE,
+    is_left=sp.TBool,
+).layout(("sibling", "is_left"))
+
+# Return type of the balanceInfo on-chain view of a lite token
+# params:
+#   balance : Current balance of the address
+#   level   : The block level at which the balance last changed
+BALANCE_INFO_TYPE = sp.TRecord(
+    balance=sp.TNat,
+    level=sp.TNat,
+).layout(("balance", "level"))
+
+# Return type of the totalSupplyInfo on-chain view of a lite token
+# params:
+#   value : Current total supply
+#   level : The block level at which the total supply last changed
+TOTAL_SUPPLY_INFO_TYPE = sp.TRecord(
+    value=sp.TNat,
+    level=sp.TNat,
+).layout(("value", "level"))
+
+# Value of a balance or of the total supply of a lite token at the start of an epoch
+# params:
+#   epoch : The epoch i.e level // epoch_length
+#   value : The value at the end of the previous epoch
+CHECKPOINT_TYPE = sp.TRecord(
+    epoch=sp.TNat,
+    value=sp.TNat,
+).layout(("epoch", "value"))
@@ -0,0 +1,109 @@
+import smartpy as sp
+
+Ballot = sp.io.import_script_from_url("file:types/ballot.py")
+
+# Params:
+#   posting_period    : Seconds after voting_end during which an aggregated tally can be posted. 0 disables tallies
+#   challenge_period  : Length of the challenge window on a posted tally in seconds
+#   bond              : Tez bonded by the aggregator while posting a tally
+TALLY_PARAMETERS_TYPE = sp.TRecord(
+    posting_period=sp.TInt,
+    challenge_period=sp.TInt,
+    bond=sp.TMutez,
+).layout(("posting_period", ("challenge_period", "bond")))
+
+# A leaf of the ballot tree: a signed ballot along with the voting weight claimed by the aggregator
+# params:
+#   ballot  : The ballot signed by the voter
+#   weight  : Voting weight of the voter at origin_level - 1 of the proposal
+TALLY_LEAF_TYPE = sp.TRecord(
+    ballot=Ballot.BALLOT_TYPE,
+    weight=sp.TNat,
+).layout(("ballot", "weight"))
+
+# A node of the ballot Merkle-sum tree. A leaf node hashes the packed leaf, and its sums are the weight of the
+# leaf as per the ballot's vote_value. A parent node hashes its packed TALLY_PARENT_TYPE value, so the sums of
+# every node are bound into its own hash, and must be the sums of its children.
+TALLY_NODE_TYPE = sp.TRecord(
+    hash=sp.TBytes,
+    up_votes=sp.TNat,
+    down_votes=sp.TNat,
+).layout(("hash", ("up_votes", "down_votes")))
+
+# The value hashed by a parent node
+# params:
+#   left       : The left child node
+#   right      : The right child node
+#   up_votes   : Up-votes of the parent node
+#   down_votes : Down-votes of the parent node
+TALLY_PARENT_TYPE = sp.TRecord(
+    left=TALLY_NODE_TYPE,
+    right=TALLY_NODE_TYPE,
+    up_votes=sp.TNat,
+    down_votes=sp.TNat,
+).layout(("left", ("right", ("up_votes", "down_votes"))))
+
+# The value hashed by a node, revealed to open it
+TALLY_OPENING_TYPE = sp.TVariant(
+    leaf=TALLY_LEAF_TYPE,
+    parent=TALLY_PARENT_TYPE,
+).layout(("leaf", "parent"))
+
+# A request to reveal the value hashed by a node of the tree
+# params:
+#   node      : The node to be opened
+#   requester : Address that requested the opening and bonded tez
+#   deadline  : The timestamp until which the node can be opened
+#   bond      : The tez bonded by the requester
+TALLY_OPENING_REQUEST_TYPE = sp.TRecord(
+    node=TALLY_NODE_TYPE,
+    requester=sp.TAddress,
+    deadline=sp.TTimestamp,
+    bond=sp.TMutez,
+).layout(("node", ("requester", ("deadline", "bond"))))
+
+# params:
+#   aggregator     : Address that posted the tally and bonded tez
+#   up_votes       : Aggregated up-votes of the off-chain ballots
+#   down_votes     : Aggregated down-votes of the off-chain ballots
+#   ballots_root   : Hash of the root node of the ballot Merkle-sum tree
+#   challenge_end  : The timestamp at which the challenge window closes
+#   bond           : The tez bonded by the aggregator
+#   opening        : The pending request to open a node of the tree, if any
+TALLY_TYPE = sp.TRecord(
+    aggregator=sp.TAddress,
+    up_votes=sp.TNat,
+    down_votes=sp.TNat,
+    ballots_root=sp.TBytes,
+    challenge_end=sp.TTimestamp,
+    bond=sp.TMutez,
+    opening=sp.TOption(TALLY_OPENING_REQUEST_TYPE),
+).layout(
+    (
+        "aggregator",
+        (
+            "up_votes",
+            (
+                "down_votes",
+                (
+                    "ballots_root",
+                    (
+                        "challenge_end",
+                        (
+                            "bond",
+                            "opening",
+                        ),
+                    ),
+                ),
+            ),
+        ),
+    ),
+)
+
+# params:
+#   sibling : The sibling node at this height of the tree
+#   is_left : True when the sibling is the left child of the parent node
+TALLY_PROOF_STEP_TYPE = sp.TRecord(
+    sibling=TALLY_NODE_TYPE,
+    is_left=sp.TBool,
+).layout(("sibling", "is_left"))